@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+import os
+import threading
+
+from flask import abort, request, send_file
+from werkzeug.utils import safe_join
+
+from workspace import write_atomic
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+# Versioned URLs (?v=<hash>) never change content, so browsers may keep them
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+MIN_COMPRESS_BYTES = 1024
+MIMETYPES = {".glb": "model/gltf-binary", ".gltf": "model/gltf+json", ".xyz": "chemical/x-xyz"}
+
+# Preferred first; only encodings whose module is available are produced
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")] if brotli is not None else [("gzip", ".gz")]
+
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class ArtifactStore:
+    """Content hashes and precompressed variants of files under one directory"""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        # path -> (mtime_ns, size, digest, {encoding: variant path})
+        self._info = {}
+
+    def info(self, path):
+        """(digest, variants) for a file, (re)compressing when it changed"""
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._info.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2], cached[3]
+
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        variants = {}
+        if len(data) >= MIN_COMPRESS_BYTES:
+            for encoding, suffix in ENCODINGS:
+                compressed = _compress(data, encoding)
+                # Skip variants that don't pay for themselves
+                if len(compressed) < len(data) * 0.9:
+                    write_atomic(path + suffix, compressed)
+                    variants[encoding] = path + suffix
+
+        with self._lock:
+            self._info[path] = (stat.st_mtime_ns, stat.st_size, digest, variants)
+        return digest, variants
+
+    def precompress(self, filename):
+        """Hash and compress ahead of the first request"""
+        path = safe_join(self.root, filename)
+        if path and os.path.isfile(path):
+            self.info(path)
+
+    def url(self, filename, prefix="/outputs"):
+        """Content-versioned URL, cacheable forever"""
+        path = safe_join(self.root, filename)
+        digest, _ = self.info(path)
+        return f"{prefix}/{filename}?v={digest[:16]}"
+
+    def serve(self, filename):
+        """Response with a strong ETag, precompressed body and Range support"""
+        path = safe_join(self.root, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        digest, variants = self.info(path)
+
+        # Ranges address the identity bytes, so only whole responses get compressed
+        encoding = None
+        if request.range is None:
+            accepted = request.accept_encodings
+            encoding = next((e for e, _ in ENCODINGS if e in variants and accepted[e]), None)
+
+        mimetype = MIMETYPES.get(os.path.splitext(path)[1].lower())
+        etag = digest[:32] if encoding is None else f"{digest[:32]}-{encoding}"
+        immutable = request.args.get("v") == digest[:16]
+
+        response = send_file(
+            os.path.abspath(variants[encoding] if encoding else path),
+            mimetype=mimetype,
+            download_name=os.path.basename(path),
+            etag=etag,
+            conditional=True,
+            max_age=IMMUTABLE_MAX_AGE if immutable else 0,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if immutable:
+            response.cache_control.immutable = True
+        else:
+            # Unversioned URLs may be rebuilt in place: always revalidate (cheap 304)
+            response.cache_control.no_cache = True
+        response.vary.add("Accept-Encoding")
+        return response
@@ -0,0 +1,92 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+# Largest batch and how long to wait for more prompts after the first one
+BATCH_SIZE = int(os.environ.get("EXPLAIN_BATCH_SIZE", 8))
+BATCH_WINDOW = float(os.environ.get("EXPLAIN_BATCH_WINDOW_MS", 50)) / 1000
+
+
+class BatchGenerator:
+    """Collects prompts arriving within a short window into one batched call.
+
+    `generate_batch(prompts)` must return one result per prompt, in order.
+    Callers block on `generate(prompt)` and get back only their own result.
+    """
+
+    def __init__(self, generate_batch, max_batch_size=BATCH_SIZE, window=BATCH_WINDOW, history=100):
+        self.generate_batch = generate_batch
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self.batches = deque(maxlen=history)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="batch-inference", daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt):
+        future = Future()
+        self._queue.put((prompt, future, time.time()))
+        return future
+
+    def generate(self, prompt, timeout=None):
+        return self.submit(prompt).result(timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.time() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            prompts = [prompt for prompt, _, _ in batch]
+            start = time.time()
+            try:
+                results = self.generate_batch(prompts)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            elapsed = time.time() - start
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+            self._record(batch, start, elapsed)
+
+    def _record(self, batch, start, elapsed):
+        waits = [start - queued for _, _, queued in batch]
+        stats = {
+            "size": len(batch),
+            "generate_seconds": round(elapsed, 3),
+            "mean_queue_wait": round(sum(waits) / len(waits), 3),
+            "max_latency": round(max(waits) + elapsed, 3),
+            "per_second": round(len(batch) / elapsed, 2) if elapsed > 0 else None,
+        }
+        self.batches.append(stats)
+        print(f"📦 Batch of {stats['size']}: {stats['generate_seconds']}s, "
+              f"{stats['per_second']}/s, max latency {stats['max_latency']}s")
+
+    def stats(self):
+        batches = list(self.batches)
+        total = sum(b["size"] for b in batches)
+        busy = sum(b["generate_seconds"] for b in batches)
+        return {
+            "max_batch_size": self.max_batch_size,
+            "window_ms": round(self.window * 1000),
+            "queued": self._queue.qsize(),
+            "recent_batches": len(batches),
+            "mean_batch_size": round(total / len(batches), 2) if batches else None,
+            "per_second": round(total / busy, 2) if busy else None,
+            "last": batches[-1] if batches else None,
+        }
@@ -0,0 +1,328 @@
+"""Benchmark every molecule build stage over molecule_db.
+
+    python benchmarks/bench_pipeline.py [--repeat 3] [--limit N] [--explain]
+    python benchmarks/bench_pipeline.py --save-baseline
+
+Each molecule goes through generate_xyz, generate_blender_py, a Blender
+export (one process per build, and through the worker pool) and the
+native GLB writer; --explain adds explanation generation. For every stage
+we record wall time, CPU time (including child processes), peak resident
+memory of this process and of its children (Blender, RDKit and model
+allocations included) and artifact size, then compare the totals against
+benchmarks/baseline.json. The committed baseline was recorded with the
+fake Blender; save your own with --save-baseline before comparing on
+other hardware.
+
+Blender is replaced by benchmarks/fake_blender/blender (blender.cmd on
+Windows) unless --blender points at a real executable, so the suite runs
+anywhere and geometry changes still show up in the numbers.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no child-process CPU accounting
+    resource = None
+try:
+    import psutil  # type: ignore
+except ImportError:
+    psutil = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+# Windows can't run the script through its shebang, blender.cmd starts it with FAKE_BLENDER_PYTHON
+FAKE_BLENDER = os.path.join(BENCH_DIR, "fake_blender", "blender.cmd" if os.name == "nt" else "blender")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+STAGES = ("generate_xyz", "generate_blender_py", "blender_export", "blender_pool", "native_glb", "explain_molecule")
+
+
+def _children_cpu():
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _maxrss_kb(who):
+    """Peak RSS from getrusage in KB (macOS reports bytes, Linux KB)"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / 1024 if sys.platform == "darwin" else float(peak)
+
+
+def _rss_kb():
+    """Current RSS of (this process, its live children) in KB, None where unavailable"""
+    if psutil is not None:
+        proc = psutil.Process()
+        children = 0
+        for child in proc.children(recursive=True):
+            try:
+                children += child.memory_info().rss
+            except psutil.Error:
+                pass  # exited meanwhile
+        return proc.memory_info().rss / 1024, children / 1024
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024, None
+    except (OSError, ValueError, AttributeError):
+        return None, None
+
+
+class MemorySampler:
+    """Peak RSS growth of this process and peak RSS of its children during a with-block.
+
+    RSS is sampled from a background thread. Children that exit inside the
+    block are covered by getrusage(RUSAGE_CHILDREN); live ones (pool
+    workers) are only sampled when psutil is installed. Without a way to
+    read the current RSS, growth of our own ru_maxrss is used instead.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.own_peak = self.child_peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _sample(self):
+        own, children = _rss_kb()
+        if own is not None:
+            self.own_peak = max(self.own_peak or 0.0, own)
+        if children is not None:
+            self.child_peak = max(self.child_peak or 0.0, children)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.own_start = _rss_kb()[0]
+        self.maxrss_start = _maxrss_kb(resource.RUSAGE_SELF) if resource else 0.0
+        self.child_maxrss_start = _maxrss_kb(resource.RUSAGE_CHILDREN) if resource else 0.0
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def stats(self):
+        if self.own_start is not None:
+            own = self.own_peak - self.own_start
+        else:
+            own = _maxrss_kb(resource.RUSAGE_SELF) - self.maxrss_start if resource else 0.0
+        children = self.child_peak or 0.0
+        if resource is not None:
+            exited = _maxrss_kb(resource.RUSAGE_CHILDREN)
+            if exited > self.child_maxrss_start:
+                children = max(children, exited)
+        return {"peak_kb": round(max(own, 0.0), 1), "child_peak_kb": round(children, 1)}
+
+
+def measure(fn, repeat):
+    """Run fn once while sampling memory, then `repeat` timed runs"""
+    with MemorySampler() as memory:
+        result = fn()
+
+    walls, cpus = [], []
+    for _ in range(repeat):
+        cpu0, child0, wall0 = time.process_time(), _children_cpu(), time.perf_counter()
+        result = fn()
+        walls.append(time.perf_counter() - wall0)
+        cpus.append(time.process_time() - cpu0 + _children_cpu() - child0)
+    return result, {
+        "wall": round(statistics.median(walls), 5),
+        "cpu": round(statistics.median(cpus), 5),
+        **memory.stats(),
+    }
+
+
+def _size(*paths):
+    return sum(os.path.getsize(p) for p in paths if p and os.path.exists(p))
+
+
+def run(entries, stages, repeat, blender_path):
+    os.environ["BLENDER_PATH"] = blender_path
+    os.environ.setdefault("FAKE_BLENDER_PYTHON", sys.executable)
+    sys.path.insert(0, ROOT)
+    from generate_xyz import build_molecule, write_xyz
+    from blender_script_gen import generate_blender_py, write_blender_payload
+    from export_glb_blender import run_blender_script
+    from gltf_writer import write_glb, low_detail_path
+
+    results = {}
+    failures = {}
+
+    explain = None
+    if "explain_molecule" in stages:
+        explain = _load_explainer()
+
+    pool = None
+    if "blender_pool" in stages:
+        from blender_pool import BlenderPool
+        start = time.perf_counter()
+        pool = BlenderPool(size=1, blender_path=blender_path)
+        print(f"🧵 Pool startup: {time.perf_counter() - start:.2f}s")
+
+    workdir = tempfile.mkdtemp(prefix="molbench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # generated files use relative molecules/ and outputs/ paths
+    try:
+        for name, smiles in entries:
+            def record(stage, fn, *paths):
+                try:
+                    result, stats = measure(fn, repeat)
+                except Exception as e:
+                    failures.setdefault(stage, {})[name] = str(e)
+                    print(f"❌ {stage} {name}: {e}")
+                    return None
+                stats["bytes"] = _size(*(paths or [result]))
+                results.setdefault(stage, {})[name] = stats
+                return result
+
+            def generate():
+                built = build_molecule(smiles, name)
+                return built, write_xyz(built, f"molecules/{name}.xyz")
+
+            built = record("generate_xyz", generate, f"molecules/{name}.xyz")
+            if built is None:
+                continue
+            mol = built[0]
+            glb = os.path.abspath(f"outputs/{name}.glb")
+            os.makedirs("outputs", exist_ok=True)
+
+            if "generate_blender_py" in stages:
+                record("generate_blender_py", lambda: generate_blender_py(mol, name, glb),
+                       f"molecules/{name}_blender.py", f"molecules/{name}_payload.json")
+            if "blender_export" in stages:
+                script = generate_blender_py(mol, name, glb)
+                record("blender_export", lambda: run_blender_script(script), glb)
+            if pool is not None:
+                payload = os.path.abspath(write_blender_payload(mol, f"molecules/{name}_payload.json"))
+                record("blender_pool", lambda: pool.build_payload(payload, glb), glb)
+            if "native_glb" in stages:
+                record("native_glb", lambda: write_glb(mol, glb), glb)
+                record("native_glb_low", lambda: write_glb(mol, low_detail_path(glb), detail="low"))
+            if explain is not None:
+                record("explain_molecule", lambda: explain(name))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        if pool is not None:
+            pool.close()
+
+    return results, failures
+
+
+def _load_explainer():
+    """Generation without the explanation cache; model load timed once"""
+    os.environ.setdefault("MODEL_WARMUP", "lazy")
+    try:
+        import main
+        start = time.perf_counter()
+        main.models.get("flan-t5")
+    except Exception as e:
+        print(f"⚠️ Skipping explain_molecule: {e}")
+        return None
+    print(f"🧠 Explainer loaded: {time.perf_counter() - start:.2f}s")
+    return lambda name: main.generate_explanation(name)["text"]
+
+
+def totals(molecules):
+    return {
+        "wall": round(sum(m["wall"] for m in molecules.values()), 4),
+        "cpu": round(sum(m["cpu"] for m in molecules.values()), 4),
+        "peak_kb": max(m["peak_kb"] for m in molecules.values()),
+        "child_peak_kb": max(m.get("child_peak_kb", 0) for m in molecules.values()),
+        "bytes": sum(m["bytes"] for m in molecules.values()),
+        "molecules": len(molecules),
+    }
+
+
+def compare(report, baseline, threshold):
+    """Stages whose total time or artifact size grew past the threshold"""
+    regressions = []
+    print(f"\n{'stage':<22}{'wall s':>10}{'cpu s':>10}{'peak KB':>10}{'child KB':>10}{'bytes':>12}   vs baseline")
+    for stage, total in report["totals"].items():
+        base = (baseline or {}).get("totals", {}).get(stage)
+        notes = []
+        if base:
+            for key in ("wall", "cpu", "bytes"):
+                if base[key] and total[key] > base[key] * (1 + threshold):
+                    regressions.append((stage, key, base[key], total[key]))
+                if base[key]:
+                    notes.append(f"{key} {100 * (total[key] / base[key] - 1):+.0f}%")
+            if base["molecules"] != total["molecules"]:
+                notes.append(f"{base['molecules']} -> {total['molecules']} molecules")
+        print(f"{stage:<22}{total['wall']:>10.3f}{total['cpu']:>10.3f}{total['peak_kb']:>10.0f}"
+              f"{total.get('child_peak_kb', 0):>10.0f}{total['bytes']:>12}   {', '.join(notes) or '-'}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the molecule build stages")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=[s for s in STAGES if s != "explain_molecule"])
+    parser.add_argument("--explain", action="store_true", help="also benchmark explanation generation")
+    parser.add_argument("--limit", type=int, default=None, help="only the first N molecule_db entries")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (median is kept)")
+    parser.add_argument("--blender", default=FAKE_BLENDER, help="Blender executable (default: the fake one)")
+    parser.add_argument("--output", default=None, help="write the full report as JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed growth before a stage regresses")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from molecule_db import molecule_db
+    entries = list(molecule_db.items())[:args.limit]
+    stages = list(args.stages) + (["explain_molecule"] if args.explain else [])
+
+    results, failures = run(entries, stages, args.repeat, args.blender)
+    report = {
+        "meta": {
+            "time": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "blender": "fake" if args.blender == FAKE_BLENDER else args.blender,
+            "repeat": args.repeat,
+        },
+        "totals": {stage: totals(molecules) for stage, molecules in results.items()},
+        "stages": results,
+        "failures": failures,
+    }
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"✅ Baseline saved: {args.baseline}")
+    elif baseline is None:
+        print(f"⚠️ No baseline at {args.baseline}, run with --save-baseline to create one")
+
+    for stage, key, before, after in regressions:
+        print(f"❌ {stage} {key}: {before} -> {after}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+@echo off
+rem Windows launcher for the fake Blender next to this file.
+rem bench_pipeline.py sets FAKE_BLENDER_PYTHON to its own interpreter.
+setlocal
+set "FAKE_PYTHON=%FAKE_BLENDER_PYTHON%"
+if not defined FAKE_PYTHON set "FAKE_PYTHON=python"
+"%FAKE_PYTHON%" "%~dp0blender" %*
+exit /b %ERRORLEVEL%
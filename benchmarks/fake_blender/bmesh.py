@@ -0,0 +1,74 @@
+# Minimal bmesh stand-in: generates the same vertex/face counts as Blender's
+# create_uvsphere / create_cone, triangulated
+import math
+from types import SimpleNamespace
+
+
+class BMesh:
+    def __init__(self):
+        self.verts = []
+        self.faces = []
+
+    def _add(self, verts, faces):
+        base = len(self.verts)
+        self.verts.extend(verts)
+        self.faces.extend(tuple(base + i for i in face) for face in faces)
+
+    def to_mesh(self, mesh):
+        mesh.vertices = list(self.verts)
+        mesh.polygons = list(self.faces)
+
+    def free(self):
+        self.verts = self.faces = None
+
+
+def new():
+    return BMesh()
+
+
+def _create_uvsphere(bm, u_segments, v_segments, radius, **kwargs):
+    verts = [(0.0, 0.0, radius)]
+    for ring in range(1, v_segments):
+        theta = math.pi * ring / v_segments
+        for s in range(u_segments):
+            phi = 2 * math.pi * s / u_segments
+            verts.append((radius * math.sin(theta) * math.cos(phi),
+                          radius * math.sin(theta) * math.sin(phi),
+                          radius * math.cos(theta)))
+    verts.append((0.0, 0.0, -radius))
+
+    bottom = len(verts) - 1
+    ring_start = lambda ring: 1 + (ring - 1) * u_segments  # noqa: E731
+    faces = []
+    for s in range(u_segments):
+        t = (s + 1) % u_segments
+        faces.append((0, ring_start(1) + s, ring_start(1) + t))
+        for ring in range(1, v_segments - 1):
+            a, b = ring_start(ring), ring_start(ring + 1)
+            faces += [(a + s, b + s, a + t), (a + t, b + s, b + t)]
+        last = ring_start(v_segments - 1)
+        faces.append((last + s, bottom, last + t))
+    bm._add(verts, faces)
+    return {"verts": verts}
+
+
+def _create_cone(bm, segments, radius1, radius2, depth, cap_ends=True, **kwargs):
+    verts = []
+    for z, radius in ((-depth / 2, radius1), (depth / 2, radius2)):
+        for s in range(segments):
+            phi = 2 * math.pi * s / segments
+            verts.append((radius * math.cos(phi), radius * math.sin(phi), z))
+
+    faces = []
+    for s in range(segments):
+        t = (s + 1) % segments
+        faces += [(s, t, segments + s), (t, segments + t, segments + s)]
+    if cap_ends:
+        # Blender caps are n-gons, fan-triangulated here
+        faces += [(0, t + 1, t) for t in range(1, segments - 1)]
+        faces += [(segments, segments + t, segments + t + 1) for t in range(1, segments - 1)]
+    bm._add(verts, faces)
+    return {"verts": verts}
+
+
+ops = SimpleNamespace(create_uvsphere=_create_uvsphere, create_cone=_create_cone)
@@ -0,0 +1,145 @@
+# Minimal bpy stand-in: the bpy.data / bpy.context / bpy.ops surface used by
+# blender_builder.py and blender_worker.py. export_scene.gltf writes a real
+# GLB (one mesh per datablock, one node per object) with gltf_writer.
+from types import SimpleNamespace
+
+
+class _ID:
+    def __init__(self, name, **attrs):
+        self.name = name
+        self.__dict__.update(attrs)
+
+
+class Mesh(_ID):
+    def __init__(self, name):
+        super().__init__(name, vertices=[], polygons=[], materials=[])
+
+
+class Object(_ID):
+    def __init__(self, name, data):
+        super().__init__(
+            name, data=data, location=(0.0, 0.0, 0.0), rotation_mode="XYZ",
+            rotation_quaternion=(1.0, 0.0, 0.0, 0.0), scale=(1.0, 1.0, 1.0), keyframes=[], parent=None,
+        )
+
+    def keyframe_insert(self, data_path, frame=None):
+        self.keyframes.append((data_path, frame, tuple(getattr(self, data_path))))
+        return True
+
+
+class _Collection(list):
+    def __init__(self, factory):
+        super().__init__()
+        self._factory = factory
+
+    def new(self, name, *args, **kwargs):
+        item = self._factory(name, *args, **kwargs)
+        self.append(item)
+        return item
+
+    def remove(self, item, do_unlink=True):
+        super().remove(item)
+        if do_unlink and item in context.scene.collection.objects:
+            context.scene.collection.objects.remove(item)
+
+
+class _SceneObjects(list):
+    def link(self, obj):
+        self.append(obj)
+
+
+data = SimpleNamespace()
+context = SimpleNamespace(scene=SimpleNamespace(collection=SimpleNamespace(objects=_SceneObjects())))
+
+
+def _reset():
+    data.objects = _Collection(Object)
+    data.meshes = _Collection(lambda name: Mesh(name))
+    data.materials = _Collection(lambda name: _ID(name, diffuse_color=(0.8, 0.8, 0.8, 1.0)))
+    data.curves = _Collection(lambda name, type="CURVE": _ID(name, type=type, body=""))
+    context.scene.collection.objects.clear()
+
+
+def _read_factory_settings(use_empty=False, **kwargs):
+    _reset()
+    return {"FINISHED"}
+
+
+def _mesh_index(builder, meshes, mesh):
+    import numpy as np
+
+    if id(mesh) not in meshes:
+        positions = np.array(mesh.vertices, dtype=np.float32)
+        indices = np.array(mesh.polygons, dtype=np.uint32)
+        tri = positions[indices]
+        face_normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+        normals = np.zeros_like(positions)
+        for k in range(3):
+            np.add.at(normals, indices[:, k], face_normals)
+        normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+
+        color = mesh.materials[0].diffuse_color if mesh.materials else (0.8, 0.8, 0.8, 1.0)
+        material = builder.add_material(mesh.name, color)
+        primitive = builder.add_geometry(positions, normals, indices.reshape(-1))
+        meshes[id(mesh)] = builder.add_mesh(mesh.name, primitive, material)
+    return meshes[id(mesh)]
+
+
+def _export_gltf(filepath, export_animations=True, export_yup=True, export_gpu_instances=False, **kwargs):
+    import numpy as np
+    from gltf_writer import _GLBBuilder, Z_UP_TO_Y_UP
+
+    builder = _GLBBuilder()
+    meshes = {}
+    keyframes = 0
+    objects = list(context.scene.collection.objects)
+
+    # Like Blender: linked duplicates under one parent become one instanced node
+    # (parents are identity empties here, so their transform is ignored)
+    instanced = {}
+    if export_gpu_instances:
+        for obj in objects:
+            if obj.parent is not None and isinstance(obj.data, Mesh):
+                instanced.setdefault((id(obj.parent), id(obj.data)), []).append(obj)
+        instanced = {key: group for key, group in instanced.items() if len(group) > 1}
+    grouped = {id(obj) for group in instanced.values() for obj in group}
+
+    for obj in objects:
+        keyframes += len(obj.keyframes)
+        if id(obj) in grouped:
+            continue
+        node = {
+            "name": obj.name,
+            "translation": [float(v) for v in obj.location],
+            "scale": [float(v) for v in obj.scale],
+        }
+        if obj.rotation_mode == "QUATERNION":
+            w, x, y, z = obj.rotation_quaternion
+            node["rotation"] = [x, y, z, w]
+
+        # Text curves and empties have no mesh, they export as empty nodes here
+        if isinstance(obj.data, Mesh):
+            node["mesh"] = _mesh_index(builder, meshes, obj.data)
+        builder.add_node(**node)
+
+    for group in instanced.values():
+        quats = np.array([o.rotation_quaternion if o.rotation_mode == "QUATERNION" else (1.0, 0.0, 0.0, 0.0)
+                          for o in group], dtype=np.float64)[:, [1, 2, 3, 0]]
+        builder.add_instances(group[0].parent.name, _mesh_index(builder, meshes, group[0].data),
+                              [o.location for o in group], quats, [o.scale for o in group])
+
+    if export_yup:
+        builder.add_root(name="Scene", rotation=Z_UP_TO_Y_UP)
+    if export_animations and keyframes:
+        builder.gltf["extras"] = {"keyframes": keyframes}
+    with open(filepath, "wb") as f:
+        f.write(builder.to_bytes())
+    return {"FINISHED"}
+
+
+ops = SimpleNamespace(
+    wm=SimpleNamespace(read_factory_settings=_read_factory_settings),
+    export_scene=SimpleNamespace(gltf=_export_gltf),
+)
+
+_reset()
@@ -0,0 +1,75 @@
+# Minimal mathutils stand-in: the Vector/Quaternion operations blender_builder uses
+import math
+
+
+class Vector:
+    def __init__(self, seq=(0.0, 0.0, 0.0)):
+        self._v = tuple(float(x) for x in seq)
+
+    def __iter__(self):
+        return iter(self._v)
+
+    def __len__(self):
+        return len(self._v)
+
+    def __getitem__(self, i):
+        return self._v[i]
+
+    def __repr__(self):
+        return f"Vector({self._v})"
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self, other))
+
+    def __mul__(self, scalar):
+        return Vector(a * scalar for a in self)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        return Vector(a / scalar for a in self)
+
+    def __neg__(self):
+        return Vector(-a for a in self)
+
+    @property
+    def length(self):
+        return math.sqrt(self.dot(self))
+
+    def dot(self, other):
+        return sum(a * b for a, b in zip(self, other))
+
+    def cross(self, other):
+        ax, ay, az = self
+        bx, by, bz = other
+        return Vector((ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx))
+
+    def normalized(self):
+        length = self.length
+        return self / length if length > 0 else Vector((0.0,) * len(self))
+
+    def to_track_quat(self, track="Z", up="Y"):
+        """Rotation taking +Z onto this vector (the up axis is ignored)"""
+        v = self.normalized()
+        w = 1.0 + v[2]
+        if w < 1e-8:
+            return Quaternion((0.0, 1.0, 0.0, 0.0))
+        x, y, z = -v[1], v[0], 0.0
+        norm = math.sqrt(w * w + x * x + y * y + z * z)
+        return Quaternion((w / norm, x / norm, y / norm, z / norm))
+
+
+class Quaternion:
+    """(w, x, y, z) like Blender's"""
+
+    def __init__(self, seq=(1.0, 0.0, 0.0, 0.0)):
+        self._q = tuple(float(x) for x in seq)
+
+    def __iter__(self):
+        return iter(self._q)
+
+    def __getitem__(self, i):
+        return self._q[i]
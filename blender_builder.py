@@ -0,0 +1,128 @@
+# Fixed Blender-side molecule builder. Runs inside Blender and reads the
+# atoms/bonds payload written by blender_script_gen.write_blender_payload.
+# Uses the bpy.data API (no operators) with one shared mesh and material
+# per element, so build time grows with object count, not operator calls.
+import json
+
+import bmesh  # type: ignore
+import bpy  # type: ignore
+
+ATOM_RADIUS = 0.3
+BOND_RADIUS = 0.07
+LABEL_OFFSET = 0.4
+LABEL_SCALE = 0.3
+SPHERE_SEGMENTS = 32
+SPHERE_RINGS = 16
+CYLINDER_SEGMENTS = 32
+
+
+def clear_scene():
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+
+
+def make_material(name, color):
+    mat = bpy.data.materials.new(name=name)
+    mat.diffuse_color = color
+    return mat
+
+
+def sphere_mesh(name, material):
+    mesh = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    bmesh.ops.create_uvsphere(bm, u_segments=SPHERE_SEGMENTS, v_segments=SPHERE_RINGS, radius=ATOM_RADIUS)
+    bm.to_mesh(mesh)
+    bm.free()
+    mesh.materials.append(material)
+    return mesh
+
+
+def cylinder_mesh(name):
+    # Unit depth along Z, each bond object scales it to its length
+    mesh = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    bmesh.ops.create_cone(
+        bm, cap_ends=True, segments=CYLINDER_SEGMENTS,
+        radius1=BOND_RADIUS, radius2=BOND_RADIUS, depth=1.0,
+    )
+    bm.to_mesh(mesh)
+    bm.free()
+    return mesh
+
+
+def label_curve(name, text):
+    curve = bpy.data.curves.new(name, type='FONT')
+    curve.body = text
+    return curve
+
+
+def add_group(collection, name):
+    # The glTF exporter only GPU-instances linked duplicates that share a parent
+    empty = bpy.data.objects.new(name, None)
+    collection.objects.link(empty)
+    return empty
+
+
+def add_atoms(collection, payload):
+    meshes = {}
+    labels = {}
+    groups = {}
+    for el, color in payload["colors"].items():
+        meshes[el] = sphere_mesh(f"Atom_{el}", make_material(f"Mat_{el}", color))
+        labels[el] = label_curve(f"Label_{el}", el)
+        groups[el] = add_group(collection, f"Atoms_{el}")
+
+    for i, (el, xyz) in enumerate(zip(payload["elements"], payload["coords"])):
+        atom = bpy.data.objects.new(f"{el}{i}", meshes[el])
+        atom.location = xyz
+        atom.parent = groups[el]
+        collection.objects.link(atom)
+        if payload.get("animate", True):
+            atom.keyframe_insert(data_path='location', frame=1)
+            atom.keyframe_insert(data_path='location', frame=50)
+
+        if payload.get("labels", True):
+            text_obj = bpy.data.objects.new(f"Label{i}", labels[el])
+            text_obj.location = (xyz[0] + LABEL_OFFSET, xyz[1], xyz[2])
+            text_obj.scale = (LABEL_SCALE, LABEL_SCALE, LABEL_SCALE)
+            collection.objects.link(text_obj)
+
+
+def add_bonds(collection, payload):
+    # Transforms are precomputed by bond_geometry.py outside Blender
+    cylinders = payload.get("bond_cylinders")
+    if not cylinders or not cylinders["lengths"]:
+        return
+
+    rod = cylinder_mesh("Bond")
+    group = add_group(collection, "Bonds")
+    for name, location, rotation, length in zip(
+            cylinders["names"], cylinders["locations"], cylinders["rotations"], cylinders["lengths"]):
+        cyl = bpy.data.objects.new(name, rod)
+        cyl.location = location
+        cyl.rotation_mode = 'QUATERNION'
+        cyl.rotation_quaternion = rotation
+        cyl.scale = (1, 1, length)
+        cyl.parent = group
+        collection.objects.link(cyl)
+
+
+def build(payload_path, output_path):
+    with open(payload_path, "r") as f:
+        payload = json.load(f)
+
+    clear_scene()
+    collection = bpy.context.scene.collection
+    add_atoms(collection, payload)
+    add_bonds(collection, payload)
+
+    # Y-up like the native writer's output (gltf_writer.Z_UP_TO_Y_UP)
+    export = payload.get("export", {})
+    bpy.ops.export_scene.gltf(
+        filepath=output_path,
+        export_yup=True,
+        export_animations=payload.get("animate", True),
+        export_gpu_instances=export.get("gpu_instances", True),
+        export_draco_mesh_compression_enable=export.get("draco", False),
+    )
+    return output_path
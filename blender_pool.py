@@ -0,0 +1,198 @@
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+
+from export_glb_blender import BLENDER_PATH
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_SCRIPT = os.path.join(BASE_DIR, "blender_worker.py")
+REPLY_PREFIX = "@@BLENDER_WORKER@@ "
+
+# Pool settings (override with env vars)
+POOL_SIZE = int(os.environ.get("BLENDER_POOL_SIZE", 2))
+MAX_JOBS_PER_WORKER = int(os.environ.get("BLENDER_MAX_JOBS_PER_WORKER", 50))
+HEALTH_CHECK_INTERVAL = float(os.environ.get("BLENDER_HEALTH_CHECK_INTERVAL", 30))
+STARTUP_TIMEOUT = float(os.environ.get("BLENDER_STARTUP_TIMEOUT", 60))
+JOB_TIMEOUT = float(os.environ.get("BLENDER_JOB_TIMEOUT", 120))
+
+
+class BlenderWorkerError(RuntimeError):
+    """The worker process crashed, hung or could not start"""
+
+
+class BlenderJobError(RuntimeError):
+    """The build script failed, the worker itself is still usable"""
+
+
+class BlenderWorker:
+    """One background Blender process speaking the blender_worker.py protocol"""
+
+    def __init__(self, blender_path=BLENDER_PATH, startup_timeout=STARTUP_TIMEOUT):
+        self.jobs_done = 0
+        self.last_used = time.time()
+        self._replies = queue.Queue()
+        self._log = []
+        self.process = subprocess.Popen(
+            [blender_path, "--background", "--factory-startup", "--python", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+        self._reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._reader.start()
+
+        hello = self._wait_reply(startup_timeout)
+        if not hello.get("ready"):
+            self.kill()
+            raise BlenderWorkerError(f"Blender worker did not start: {hello}")
+        print(f"🧵 Blender worker ready (pid {self.process.pid})")
+
+    def _read_stdout(self):
+        for line in self.process.stdout:
+            if line.startswith(REPLY_PREFIX):
+                self._replies.put(json.loads(line[len(REPLY_PREFIX):]))
+            else:
+                # Keep the tail of Blender's own output for error reports
+                self._log.append(line)
+                del self._log[:-200]
+        self._replies.put({"ok": False, "error": "Blender worker exited", "dead": True})
+
+    def _wait_reply(self, timeout):
+        try:
+            return self._replies.get(timeout=timeout)
+        except queue.Empty:
+            raise BlenderWorkerError(f"Blender worker timed out after {timeout}s")
+
+    def request(self, timeout, **job):
+        if not self.alive():
+            raise BlenderWorkerError("Blender worker is not running")
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+        reply = self._wait_reply(timeout)
+        self.last_used = time.time()
+        if reply.get("dead"):
+            raise BlenderWorkerError("Blender worker exited:\n" + "".join(self._log[-20:]))
+        return reply
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def ping(self, timeout=5):
+        try:
+            return self.request(timeout, cmd="ping").get("pong", False)
+        except (BlenderWorkerError, OSError):
+            return False
+
+    def build(self, timeout=JOB_TIMEOUT, **job):
+        reply = self.request(timeout, cmd="build", **job)
+        self.jobs_done += 1
+        if not reply.get("ok"):
+            raise BlenderJobError(reply.get("traceback") or reply.get("error"))
+        return reply["output"]
+
+    def close(self, timeout=5):
+        try:
+            if self.alive():
+                self.request(timeout, cmd="quit")
+            self.process.wait(timeout=timeout)
+        except (BlenderWorkerError, OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+
+
+class BlenderPool:
+    """Fixed-size pool of long-lived Blender workers"""
+
+    def __init__(self, size=POOL_SIZE, max_jobs_per_worker=MAX_JOBS_PER_WORKER,
+                 health_check_interval=HEALTH_CHECK_INTERVAL, blender_path=BLENDER_PATH):
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.health_check_interval = health_check_interval
+        self.blender_path = blender_path
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            for _ in range(self.size):
+                self._idle.put(self._spawn())
+            self._started = True
+            print(f"✅ Blender pool started with {self.size} workers")
+
+    def _spawn(self):
+        return BlenderWorker(self.blender_path)
+
+    def _checkout(self):
+        self.start()
+        worker = self._idle.get()
+        try:
+            stale = time.time() - worker.last_used > self.health_check_interval
+            if not worker.alive() or (stale and not worker.ping()):
+                worker.kill()
+                worker = self._spawn()
+        except Exception:
+            # Keep the slot so the next checkout tries again
+            self._idle.put(worker)
+            raise
+        return worker
+
+    def _checkin(self, worker):
+        if self._closed:
+            worker.close()
+            return
+        if worker.jobs_done >= self.max_jobs_per_worker:
+            # Closed workers are respawned lazily on the next checkout
+            print(f"♻️ Recycling Blender worker after {worker.jobs_done} jobs")
+            worker.close()
+        self._idle.put(worker)
+
+    def run(self, script_path, output_path, timeout=JOB_TIMEOUT):
+        """Run a generated build script on a pooled worker, returns the GLB path"""
+        return self._submit(timeout, script=script_path, output=output_path)
+
+    def build_payload(self, payload_path, output_path, timeout=JOB_TIMEOUT):
+        """Build a GLB from a blender_builder payload, returns the GLB path"""
+        return self._submit(timeout, payload=payload_path, output=output_path)
+
+    def _submit(self, timeout, **job):
+        worker = self._checkout()
+        try:
+            return worker.build(timeout=timeout, **job)
+        except BlenderWorkerError:
+            # A timed out or crashed worker is in an unknown state, replace it
+            print("⚠️ Unhealthy Blender worker killed")
+            worker.kill()
+            raise
+        finally:
+            self._checkin(worker)
+
+    def close(self):
+        self._closed = True
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_blender_pool():
+    """Process-wide pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BlenderPool()
+        return _pool
@@ -0,0 +1,75 @@
+# Long-lived Blender worker, started by blender_pool.py as:
+#   blender --background --python blender_worker.py
+# Reads one JSON job per line on stdin and answers on stdout with a line
+# prefixed by REPLY_PREFIX (Blender prints its own noise to stdout too).
+import json
+import os
+import sys
+import traceback
+
+import bpy  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import blender_builder  # noqa: E402
+
+REPLY_PREFIX = "@@BLENDER_WORKER@@ "
+
+
+def reply(**message):
+    sys.stdout.write(REPLY_PREFIX + json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def reset_scene():
+    """Start each job from an empty scene so nothing leaks between builds"""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def run_script(script_path, output_path):
+    reset_scene()
+    if output_path and os.path.exists(output_path):
+        os.remove(output_path)
+
+    with open(script_path, "r") as f:
+        code = compile(f.read(), script_path, "exec")
+    exec(code, {"__name__": "__main__", "__file__": script_path})
+
+    if output_path and not os.path.exists(output_path):
+        raise RuntimeError(f"Script finished but {output_path} was not written")
+
+
+def main():
+    reply(ok=True, ready=True, pid=os.getpid())
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            job = json.loads(line)
+        except ValueError:
+            reply(ok=False, error=f"Bad job line: {line[:200]}")
+            continue
+
+        cmd = job.get("cmd")
+        if cmd == "ping":
+            reply(ok=True, pong=True)
+        elif cmd == "quit":
+            reply(ok=True, bye=True)
+            break
+        elif cmd == "build":
+            try:
+                if "payload" in job:
+                    reset_scene()
+                    blender_builder.build(job["payload"], job["output"])
+                else:
+                    run_script(job["script"], job.get("output"))
+                reply(ok=True, output=job.get("output"))
+            except Exception as e:
+                reply(ok=False, error=str(e), traceback=traceback.format_exc())
+        else:
+            reply(ok=False, error=f"Unknown command: {cmd}")
+
+
+main()
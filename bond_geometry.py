@@ -0,0 +1,92 @@
+"""Bond cylinder transforms for every export backend, in one NumPy pass.
+
+Each bond of order n is drawn as n parallel cylinders. For all of them at
+once we compute the centre, the rotation taking +Z onto the bond, the
+length and the sideways offset of double/triple bonds.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+BOND_SHIFT = 0.15  # spacing between the cylinders of a multiple bond
+
+
+class BondGeometry(NamedTuple):
+    bond_index: np.ndarray  # (K,) bond each cylinder belongs to
+    slot: np.ndarray  # (K,) position within a multiple bond
+    positions: np.ndarray  # (K, 3) cylinder centres
+    rotations: np.ndarray  # (K, 4) quaternions (x, y, z, w) rotating +Z onto the bond
+    lengths: np.ndarray  # (K,)
+    offsets: np.ndarray  # (K,) signed sideways shift
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def rotations_wxyz(self):
+        """Quaternions in Blender's (w, x, y, z) order"""
+        return self.rotations[:, [3, 0, 1, 2]]
+
+
+def unit_vectors(vectors):
+    """Normalized rows, zero rows stay zero"""
+    norm = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norm, out=np.zeros_like(vectors, dtype=np.float64), where=norm > 1e-12)
+
+
+def perpendiculars(vectors):
+    """A unit vector perpendicular to each row.
+
+    Crosses with Z, or with X when the row is (nearly) along Z, so the
+    result never degenerates.
+    """
+    v = unit_vectors(np.asarray(vectors, dtype=np.float64))
+    reference = np.zeros_like(v)
+    along_z = np.abs(v[:, 2]) > 0.9
+    reference[~along_z, 2] = 1.0
+    reference[along_z, 0] = 1.0
+    side = unit_vectors(np.cross(v, reference))
+    side[np.all(v == 0, axis=1)] = [1.0, 0.0, 0.0]
+    return side
+
+
+def track_z_quaternions(vectors):
+    """Quaternions (x, y, z, w) rotating +Z onto each vector"""
+    v = unit_vectors(np.asarray(vectors, dtype=np.float64))
+    z = np.array([0.0, 0.0, 1.0])
+    axis = np.cross(z, v)
+    w = 1.0 + v @ z
+    quats = np.concatenate([axis, w[:, None]], axis=1)
+
+    # Anti-parallel to Z: 180 degrees about X; zero-length: identity
+    quats[w < 1e-8] = [1.0, 0.0, 0.0, 0.0]
+    quats[np.all(v == 0, axis=1)] = [0.0, 0.0, 0.0, 1.0]
+    return quats / np.linalg.norm(quats, axis=1, keepdims=True)
+
+
+def bond_geometry(coords, bond_atoms, bond_orders, shift=BOND_SHIFT) -> BondGeometry:
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    bond_atoms = np.asarray(bond_atoms, dtype=np.int64).reshape(-1, 2)
+    if len(bond_atoms) == 0:
+        empty = np.zeros(0)
+        return BondGeometry(empty.astype(np.int64), empty.astype(np.int64),
+                            np.zeros((0, 3)), np.zeros((0, 4)), empty, empty)
+
+    start = coords[bond_atoms[:, 0]]
+    end = coords[bond_atoms[:, 1]]
+    vec = end - start
+    counts = np.maximum(np.asarray(bond_orders).astype(np.int64), 1)
+
+    # One cylinder per bond order, centred around the bond axis
+    bond_index = np.repeat(np.arange(len(counts)), counts)
+    slot = np.arange(len(bond_index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    offsets = (slot - (counts[bond_index] - 1) / 2) * shift
+
+    side = perpendiculars(vec)
+    positions = (start + end)[bond_index] / 2 + side[bond_index] * offsets[:, None]
+    rotations = track_z_quaternions(vec)[bond_index]
+    lengths = np.linalg.norm(vec, axis=1)[bond_index]
+    return BondGeometry(bond_index, slot, positions, rotations, lengths, offsets)
+
+
+def molecule_bond_geometry(molecule, shift=BOND_SHIFT) -> BondGeometry:
+    return bond_geometry(molecule.coords, molecule.bond_atoms, molecule.bond_orders, shift)
@@ -0,0 +1,193 @@
+"""Bonds from bare coordinates (XYZ / PDB input) using covalent radii.
+
+Two atoms are bonded when their distance is below the sum of their
+covalent radii plus a tolerance. Candidate pairs come from a uniform
+cell list sized for typical atoms, so only atoms in neighbouring cells
+are compared and the cost grows linearly with the atom count. The few
+atoms with unusually large radii (K+, metals) search a wider block of
+cells of their own. Perceived bonds are single bonds; orders are not
+guessed.
+"""
+import os
+
+import numpy as np
+
+from molecule import Molecule, atomic_numbers, element_symbols
+
+BOND_TOLERANCE = 0.45  # Angstrom added to the radius sum
+MIN_BOND_DISTANCE = 0.4  # closer pairs are overlapping atoms, not bonds
+DEFAULT_RADIUS = 1.5
+# Cells fit bonds between atoms up to this radius percentile; larger atoms are outliers
+CELL_PERCENTILE = 99
+
+# Covalent radii by atomic number (Cordero et al. 2008), Angstrom
+COVALENT_RADII = np.full(119, DEFAULT_RADIUS)
+COVALENT_RADII[:87] = [
+    0.00, 0.31, 0.28, 1.28, 0.96, 0.84, 0.76, 0.71, 0.66, 0.57, 0.58,  # X  H  He Li Be B  C  N  O  F  Ne
+    1.66, 1.41, 1.21, 1.11, 1.07, 1.05, 1.02, 1.06, 2.03, 1.76,  # Na Mg Al Si P  S  Cl Ar K  Ca
+    1.70, 1.60, 1.53, 1.39, 1.39, 1.32, 1.26, 1.24, 1.32, 1.22,  # Sc Ti V  Cr Mn Fe Co Ni Cu Zn
+    1.22, 1.20, 1.19, 1.20, 1.20, 1.16, 2.20, 1.95, 1.90, 1.75,  # Ga Ge As Se Br Kr Rb Sr Y  Zr
+    1.64, 1.54, 1.47, 1.46, 1.42, 1.39, 1.45, 1.44, 1.42, 1.39,  # Nb Mo Tc Ru Rh Pd Ag Cd In Sn
+    1.39, 1.38, 1.39, 1.40, 2.44, 2.15, 2.07, 2.04, 2.03, 2.01,  # Sb Te I  Xe Cs Ba La Ce Pr Nd
+    1.99, 1.98, 1.98, 1.96, 1.94, 1.92, 1.92, 1.89, 1.90, 1.87,  # Pm Sm Eu Gd Tb Dy Ho Er Tm Yb
+    1.87, 1.75, 1.70, 1.62, 1.51, 1.44, 1.41, 1.36, 1.36, 1.32,  # Lu Hf Ta W  Re Os Ir Pt Au Hg
+    1.45, 1.46, 1.48, 1.40, 1.50, 1.50,  # Tl Pb Bi Po At Rn
+]
+
+# Half of the 26 neighbour cells plus the cell itself: each pair is seen once
+_HALF_SHELL = np.array(
+    [(0, 0, 0)] + [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+                   if (dx, dy, dz) > (0, 0, 0)],
+    dtype=np.int64,
+)
+
+
+def _expand_ranges(starts, counts):
+    """Concatenation of arange(s, s + c) for every (s, c)"""
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    shifts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return shifts + np.arange(total)
+
+
+def _cell_keys(cells, dims):
+    return (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+
+def _cube(reach):
+    steps = np.arange(-reach, reach + 1)
+    return np.stack(np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1).reshape(-1, 3)
+
+
+def _candidates(cells, dims, order, sorted_keys, atoms, offsets):
+    """Yield (offset, i, j): each atom i of `atoms` with every atom j in the cell at that offset"""
+    for offset in offsets:
+        neighbour = cells[atoms] + offset
+        inside = np.all((neighbour >= 0) & (neighbour < dims), axis=1)
+        keys = np.where(inside, _cell_keys(neighbour, dims), -1)
+        start = np.searchsorted(sorted_keys, keys, side="left")
+        counts = np.searchsorted(sorted_keys, keys, side="right") - start
+        yield offset, np.repeat(atoms, counts), order[_expand_ranges(start, counts)]
+
+
+def perceive_bonds(numbers, coords, tolerance=BOND_TOLERANCE, min_distance=MIN_BOND_DISTANCE):
+    """(M, 2) atom index pairs closer than their covalent radius sum + tolerance"""
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    radii = COVALENT_RADII[np.asarray(numbers, dtype=np.int64)]
+    if len(coords) < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    # Cells as wide as the longest bond between two typical atoms
+    typical = np.percentile(radii, CELL_PERCENTILE)
+    cell_size = 2 * typical + tolerance
+    outlier = radii > typical
+    cells = np.floor((coords - coords.min(axis=0)) / cell_size).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+
+    keys = _cell_keys(cells, dims)
+    order = np.argsort(keys, kind="stable")
+    grid = (cells, dims, order, keys[order])
+
+    def bonded(i, j):
+        d2 = np.einsum("ij,ij->i", coords[i] - coords[j], coords[i] - coords[j])
+        cutoff = radii[i] + radii[j] + tolerance
+        ok = (d2 < cutoff * cutoff) & (d2 > min_distance * min_distance)
+        return np.stack([i[ok], j[ok]], axis=1)
+
+    # Typical atoms: the half shell of neighbour cells sees each pair once
+    pairs = []
+    for offset, i, j in _candidates(*grid, np.flatnonzero(~outlier), _HALF_SHELL):
+        keep = ~outlier[j] & ((i < j) if not offset.any() else True)
+        pairs.append(bonded(i[keep], j[keep]))
+
+    # Outliers: every cell within reach of their longest possible bond
+    if outlier.any():
+        reach = int(np.ceil((radii[outlier].max() + radii.max() + tolerance) / cell_size))
+        for _, i, j in _candidates(*grid, np.flatnonzero(outlier), _cube(reach)):
+            keep = ~outlier[j] | (i < j)
+            pairs.append(bonded(i[keep], j[keep]))
+
+    bonds = np.concatenate(pairs)
+    bonds.sort(axis=1)
+    bonds = bonds[np.lexsort((bonds[:, 1], bonds[:, 0]))]
+    return _limit_hydrogens(np.asarray(numbers), coords, bonds)
+
+
+def _limit_hydrogens(numbers, coords, bonds):
+    """Hydrogens keep only their shortest bond.
+
+    A bond survives only if it is the shortest bond of every hydrogen it
+    touches; ties go to the earlier bond, so sort bonds first.
+    """
+    if len(bonds) == 0:
+        return bonds
+    length = np.linalg.norm(coords[bonds[:, 0]] - coords[bonds[:, 1]], axis=1)
+    index = np.arange(len(bonds))
+
+    # (hydrogen, bond) for every hydrogen endpoint, shortest bond first per hydrogen
+    ends = np.concatenate([bonds[:, 0], bonds[:, 1]])
+    owners = np.concatenate([index, index])
+    is_h = numbers[ends] == 1
+    ends, owners = ends[is_h], owners[is_h]
+    order = np.lexsort((owners, length[owners], ends))
+    atoms, first = np.unique(ends[order], return_index=True)
+    shortest = np.full(len(numbers), -1)
+    shortest[atoms] = owners[order][first]
+
+    keep = np.ones(len(bonds), dtype=bool)
+    for column in (0, 1):
+        atom = bonds[:, column]
+        keep &= (numbers[atom] != 1) | (shortest[atom] == index)
+    return bonds[keep]
+
+
+def read_pdb(path):
+    """(atomic numbers, coords) of the ATOM/HETATM records of the first model"""
+    records = []
+    with open(path, "rb") as f:
+        for line in f:
+            if line.startswith((b"ATOM", b"HETATM")):
+                records.append(line.rstrip(b"\r\n").ljust(80))
+            elif line.startswith(b"ENDMDL") and records:
+                break
+    if not records:
+        return np.zeros(0, dtype=np.uint8), np.zeros((0, 3))
+
+    table = np.array(records, dtype="S80").view(np.uint8).reshape(len(records), 80)
+    # Fixed columns: x, y, z are 8 characters each from column 31
+    coords = table[:, 30:54].copy().view("S8").astype(np.float64).reshape(-1, 3)
+
+    elements = table[:, 76:78].copy().view("S2").ravel()
+    # Old files leave the element blank: take it from the atom name
+    missing = np.char.strip(elements) == b""
+    if missing.any():
+        names = np.char.strip(table[missing, 12:14].copy().view("S2").ravel())
+        elements[missing] = [bytes(c for c in n if chr(c).isalpha())[:1] for n in names]
+    return atomic_numbers(np.char.strip(elements)), coords
+
+
+def read_structure(path):
+    """(atomic numbers, coords) from an .xyz (first frame) or .pdb file"""
+    if path.lower().endswith((".pdb", ".ent")):
+        return read_pdb(path)
+    from xyz_io import iter_frames
+    frame = next(iter_frames(path), None)
+    if frame is None:
+        raise ValueError(f"{path}: no XYZ frame")
+    return frame.numbers, frame.coords
+
+
+def molecule_from_coords(name, numbers, coords, **options):
+    """Molecule with perceived single bonds"""
+    numbers = np.asarray(numbers)
+    if numbers.dtype.kind not in "iu":
+        numbers = atomic_numbers(numbers)
+    bonds = perceive_bonds(numbers, coords, **options)
+    return Molecule(name, element_symbols(numbers), coords, [(int(i), int(j), 1.0) for i, j in bonds])
+
+
+def load_structure(path, name=None):
+    numbers, coords = read_structure(path)
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    return molecule_from_coords(name, numbers, coords)
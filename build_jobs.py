@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics
+
+# Build threads (independent of the Flask request threads)
+BUILD_WORKERS = int(os.environ.get("BUILD_WORKERS", 2))
+# Finished jobs are forgotten after this many seconds
+JOB_TTL = float(os.environ.get("BUILD_JOB_TTL", 600))
+
+
+def format_sse(event, data):
+    """One Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class BuildJob:
+    """State and progress events of one background molecule build"""
+
+    def __init__(self, molecule):
+        self.id = uuid.uuid4().hex
+        self.molecule = molecule
+        self.state = "queued"
+        self.stage = "queued"
+        self.error = None
+        self.result = None
+        self.created = time.time()
+        self.finished = None
+        self.requesters = 1
+        self.events = []
+        self.partial = []  # text published while running (e.g. generated tokens)
+        self._cond = threading.Condition()
+        self._emit(stage="queued")
+
+    def _emit(self, **event):
+        with self._cond:
+            event.update(job_id=self.id, molecule=self.molecule, state=self.state, time=time.time())
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def progress(self, stage):
+        self.state = "running"
+        self.stage = stage
+        self._emit(stage=stage)
+
+    def publish(self, text):
+        """Append partial output for anyone following the job live"""
+        with self._cond:
+            self.partial.append(text)
+            self._cond.notify_all()
+
+    def succeed(self, result):
+        self.result = result
+        self.state = self.stage = "done"
+        self.finished = time.time()
+        self._emit(stage="done", result=result)
+
+    def fail(self, error):
+        self.error = error
+        self.state = self.stage = "failed"
+        self.finished = time.time()
+        self._emit(stage="failed", error=error)
+
+    @property
+    def done(self):
+        return self.state in ("done", "failed")
+
+    def wait_events(self, since, timeout=15):
+        """Events after index `since`, blocking up to timeout for new ones"""
+        with self._cond:
+            if len(self.events) <= since and not self.done:
+                self._cond.wait(timeout)
+            return self.events[since:]
+
+    def wait_partial(self, since, timeout=15):
+        """Partial text pieces after index `since`, blocking up to timeout for new ones"""
+        with self._cond:
+            if len(self.partial) <= since and not self.done:
+                self._cond.wait(timeout)
+            return self.partial[since:]
+
+    def wait(self, timeout=None):
+        """Block until the job ends, returns True if it did"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while not self.done:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "molecule": self.molecule,
+            "state": self.state,
+            "stage": self.stage,
+            "error": self.error,
+            "result": self.result,
+            "requesters": self.requesters,
+            "elapsed": round((self.finished or time.time()) - self.created, 3),
+        }
+
+    def sse_stream(self, heartbeat=15):
+        """Server-Sent Events: one `progress` event per stage until the job ends"""
+        sent = 0
+        while True:
+            events = self.wait_events(sent, timeout=heartbeat)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                yield format_sse("progress", event)
+            sent += len(events)
+            if self.done and sent >= len(self.events):
+                return
+
+
+class BuildJobManager:
+    """Runs build functions on a background executor and tracks their jobs.
+
+    Builds are single-flight per molecule: a request for a molecule that is
+    already building attaches to the running job instead of starting another
+    one. Different molecules still build in parallel. With `partial=True`
+    build functions also get a `publish` callback for live partial output.
+    """
+
+    def __init__(self, build_fn, max_workers=BUILD_WORKERS, ttl=JOB_TTL, name="build", partial=False):
+        self.build_fn = build_fn
+        self.name = name
+        self.partial = partial
+        self.ttl = ttl
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="build")
+        self._jobs = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, molecule, *args):
+        with self._lock:
+            self._prune()
+            job = self._inflight.get(molecule)
+            if job is not None and not job.done:
+                job.requesters += 1
+                print(f"🔗 Joined running build: {molecule} ({job.requesters} requesters)")
+                return job
+
+            job = BuildJob(molecule)
+            self._jobs[job.id] = job
+            self._inflight[molecule] = job
+        self.executor.submit(self._run, job, args)
+        return job
+
+    def inflight(self, molecule):
+        """The running job for a molecule, or None"""
+        with self._lock:
+            job = self._inflight.get(molecule)
+            return job if job is not None and not job.done else None
+
+    def latest(self, molecule):
+        """The running job for a molecule, else its newest successful one within the TTL"""
+        with self._lock:
+            self._prune()
+            job = self._inflight.get(molecule)
+            if job is not None and not job.done:
+                return job
+            finished = [j for j in self._jobs.values() if j.molecule == molecule and j.state == "done"]
+            return max(finished, key=lambda j: j.finished, default=None)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, args):
+        metrics.observe(f"{self.name}_queue_wait", time.time() - job.created, molecule=job.molecule)
+        try:
+            extra = {"publish": job.publish} if self.partial else {}
+            result = self.build_fn(job.molecule, *args, progress=job.progress, **extra)
+            job.succeed(result)
+        except Exception as e:
+            print(f"❌ Build failed: {job.molecule}")
+            traceback.print_exc()
+            job.fail(str(e))
+        finally:
+            # Submit to finish, what the first requester waited
+            metrics.observe(f"{self.name}_wait", time.time() - job.created, error=job.state == "failed",
+                            molecule=job.molecule, requesters=job.requesters)
+            with self._lock:
+                if self._inflight.get(job.molecule) is job:
+                    del self._inflight[job.molecule]
+
+    def _prune(self):
+        now = time.time()
+        for job_id in [k for k, job in self._jobs.items() if job.done and now - job.finished > self.ttl]:
+            del self._jobs[job_id]
@@ -0,0 +1,167 @@
+"""Prebuild GLBs for a list of molecules into the shared artifact cache.
+
+Usage:
+    python bulk_build.py curriculum.csv --workers 8
+    python bulk_build.py molecules.smi --manifest bulk_manifest.jsonl
+    python bulk_build.py            # every entry in molecule_db
+
+CSV files need a `smiles` column and may have a `name` column. SMILES
+files have one `SMILES [name]` entry per line. Progress is appended to a
+JSONL manifest; rerunning with the same manifest skips finished entries.
+Entries are identified by (name, canonical SMILES), and each GLB file name
+carries a short hash of the SMILES, so rows whose names collide, or a
+name whose SMILES changed, never share a manifest record or an output.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import blender_pool
+import molecule_pipeline
+from glb_cache import canonical_smiles
+from molecule_db import molecule_db
+
+DEFAULT_MANIFEST = "bulk_manifest.jsonl"
+DEFAULT_OUT_DIR = "outputs/bulk"
+FINISHED = ("ok", "cached")
+
+
+def safe_name(name):
+    return re.sub(r"[^\w\- ]+", "_", name.strip().lower()) or "molecule"
+
+
+def read_entries(path):
+    """Stream (name, smiles) pairs from a CSV / SMILES file, or molecule_db"""
+    if path is None:
+        yield from molecule_db.items()
+        return
+
+    with open(path, "r", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for i, row in enumerate(csv.DictReader(f), start=1):
+                row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+                if row.get("smiles"):
+                    yield safe_name(row.get("name") or f"mol{i}"), row["smiles"]
+            return
+
+        for i, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split(None, 1)
+            yield safe_name(parts[1] if len(parts) > 1 else f"mol{i}"), parts[0]
+
+
+def output_name(name, canonical):
+    """GLB file stem, unique per (name, canonical SMILES)"""
+    return f"{name}-{hashlib.sha256(canonical.encode()).hexdigest()[:8]}"
+
+
+def read_manifest(path):
+    """Latest record per (name, canonical SMILES)"""
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn last line after a crash
+            canonical = record.get("canonical") or canonical_smiles(record["smiles"])
+            records[(record["name"], canonical)] = record
+    return records
+
+
+def _init_worker():
+    # One Blender worker per build process is enough
+    blender_pool._pool = blender_pool.BlenderPool(size=1)
+
+
+def _build_one(name, smiles, out_dir, file_name):
+    start = time.time()
+    glb_path = os.path.join(out_dir, f"{file_name}.glb")
+    try:
+        molecule_pipeline.build_glb(name, smiles, glb_path)
+        return {"status": "ok", "glb": glb_path, "seconds": round(time.time() - start, 3)}
+    except Exception as e:
+        return {"status": "failed", "error": str(e), "seconds": round(time.time() - start, 3)}
+
+
+def run(entries, workers, manifest_path, out_dir, retry_failed=False):
+    done = read_manifest(manifest_path)
+    counts = {"ok": 0, "cached": 0, "failed": 0, "skipped": 0}
+    os.makedirs(out_dir, exist_ok=True)
+
+    with open(manifest_path, "a") as manifest, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+
+        def record(name, smiles, canonical, result):
+            result.update(name=name, smiles=smiles, canonical=canonical, time=time.time())
+            manifest.write(json.dumps(result) + "\n")
+            manifest.flush()
+            counts[result["status"]] += 1
+            print(f"{'✅' if result['status'] != 'failed' else '❌'} {name}: {result['status']} "
+                  f"({result.get('seconds', 0)}s)")
+
+        pending = {}
+        seen = set()
+        for name, smiles in entries:
+            canonical = canonical_smiles(smiles)
+            key = (name, canonical)
+            previous = done.get(key)
+            if key in seen or previous and (previous["status"] in FINISHED or not retry_failed):
+                counts["skipped"] += 1
+                continue
+            seen.add(key)
+            if molecule_pipeline.glb_cached(smiles):
+                record(name, smiles, canonical, {"status": "cached"})
+                continue
+
+            future = pool.submit(_build_one, name, smiles, out_dir, output_name(name, canonical))
+            pending[future] = (name, smiles, canonical)
+
+            # Keep a bounded number of builds queued so huge inputs stream through
+            while len(pending) >= workers * 2:
+                pending = _collect(pending, record)
+
+        while pending:
+            pending = _collect(pending, record)
+
+    return counts
+
+
+def _collect(pending, record):
+    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in finished:
+        name, smiles, canonical = pending.pop(future)
+        result = future.result()
+        if result["status"] == "ok":
+            # Safe next to a live server: every cache entry has its own metadata file
+            molecule_pipeline.cache_glb(smiles, result["glb"])
+            result["size"] = os.path.getsize(result["glb"])
+        record(name, smiles, canonical, result)
+    return pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prebuild molecule GLBs into the artifact cache")
+    parser.add_argument("input", nargs="?", help="CSV or SMILES file (default: molecule_db)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR)
+    parser.add_argument("--retry-failed", action="store_true", help="rebuild entries that failed last time")
+    args = parser.parse_args()
+
+    start = time.time()
+    counts = run(read_entries(args.input), args.workers, args.manifest, args.out_dir, args.retry_failed)
+    print(f"🏁 Done in {time.time() - start:.1f}s: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+import threading
+
+from lru_index import LRUIndex, write_json_atomic
+
+# Cache location, disk budget and sampled variants kept per molecule
+CACHE_DIR = os.environ.get("EXPLANATION_CACHE_DIR", "cache/explanations")
+CACHE_MAX_BYTES = int(os.environ.get("EXPLANATION_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+VARIANTS = int(os.environ.get("EXPLANATION_VARIANTS", 1))
+
+
+def explanation_key(molecule, prompt_template, params):
+    """Key from molecule + prompt template + generation parameters"""
+    raw = json.dumps([molecule.strip().lower(), prompt_template, params], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ExplanationCache:
+    """Disk-backed LLM explanation cache with LRU eviction by size.
+
+    Each key keeps up to `variants` sampled explanations. Until that many
+    exist a lookup misses so a new one gets generated; after that lookups
+    rotate through the stored variants.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, variants=VARIANTS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.variants = max(1, variants)
+        self._lock = threading.Lock()
+        self._cursors = {}
+        os.makedirs(root, exist_ok=True)
+        self.index = LRUIndex(root, ".json", max_bytes)
+
+    def path_for(self, key):
+        return self.index.path_for(key)
+
+    def get(self, molecule, prompt_template, params):
+        key = explanation_key(molecule, prompt_template, params)
+        variants = self._read(key)
+        if not variants or len(variants) < self.variants:
+            return None
+
+        with self._lock:
+            cursor = self._cursors.get(key, 0) % len(variants)
+            self._cursors[key] = cursor + 1
+        self.index.touch(key, self.index.read(key) or {"molecule": molecule})
+        return variants[cursor]
+
+    def add(self, molecule, prompt_template, params, text):
+        key = explanation_key(molecule, prompt_template, params)
+        with self._lock:
+            variants = (self._read(key) + [text])[-self.variants:]
+            self._write(key, molecule, variants)
+            self.index.write(key, {
+                "molecule": molecule,
+                "count": len(variants),
+                "size": os.path.getsize(self.path_for(key)),
+            })
+        self.index.evict()
+
+    def count(self, molecule, prompt_template, params):
+        return len(self._read(explanation_key(molecule, prompt_template, params)))
+
+    def _read(self, key):
+        try:
+            with open(self.path_for(key), "r") as f:
+                return json.load(f)["variants"]
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def _write(self, key, molecule, variants):
+        write_json_atomic(self.path_for(key), {"molecule": molecule, "variants": variants})
@@ -1,10 +1,18 @@
+import os
+import shutil
 import subprocess
 
-def run_blender_script(script_path):
-    blender_path = r"C:\Program Files\Blender Foundation\Blender 4.4\blender.exe"  # ✅ Update path if needed
+BLENDER_PATH = os.environ.get(
+    "BLENDER_PATH",
+    r"C:\Program Files\Blender Foundation\Blender 4.4\blender.exe"  # ✅ Update path if needed
+)
+
+def blender_available():
+    return os.path.exists(BLENDER_PATH) or shutil.which(BLENDER_PATH) is not None
 
+def run_blender_script(script_path):
     cmd = [
-        blender_path,
+        BLENDER_PATH,
         "--background",
         "--python",
         script_path
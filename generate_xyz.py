@@ -1,29 +1,90 @@
 from rdkit import Chem  # type: ignore
 from rdkit.Chem import AllChem  # type: ignore
+import math
 import os
+import time
 
-def generate_xyz(smiles: str, name: str) -> str:
+from molecule import Molecule
+from xyz_io import write_frames
+
+# Conformer search settings (override with env vars)
+EMBED_CONFORMERS = int(os.environ.get("EMBED_CONFORMERS", 8))
+EMBED_THREADS = int(os.environ.get("EMBED_THREADS", 0))  # 0 = all cores
+EMBED_TIMEOUT = float(os.environ.get("EMBED_TIMEOUT", 10))  # seconds
+PRUNE_RMS = float(os.environ.get("EMBED_PRUNE_RMS", 0.5))  # Angstrom
+RANDOM_SEED = 0xC0FFEE
+
+def _embed_params(threads, seed, timeout=0):
+    params = AllChem.ETKDGv3()
+    params.randomSeed = seed
+    params.numThreads = threads
+    if timeout > 0 and hasattr(params, "timeout"):
+        # RDKit limits each attempt in whole seconds; the overall deadline is checked between batches
+        params.timeout = math.ceil(timeout)
+    return params
+
+def embed_conformers(mol, name, num_confs=EMBED_CONFORMERS, timeout=EMBED_TIMEOUT, threads=EMBED_THREADS):
+    """Embed conformers in parallel batches until num_confs or the deadline, falling back to cheaper settings"""
+    deadline = time.monotonic() + timeout
+    batch_size = threads if threads > 0 else os.cpu_count() or 1
+
+    mol.RemoveAllConformers()
+    batch = 0
+    while mol.GetNumConformers() < num_confs:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        # Later batches keep earlier conformers and are RMS-pruned against them
+        params = _embed_params(threads, RANDOM_SEED + batch, remaining)
+        params.pruneRmsThresh = PRUNE_RMS
+        params.clearConfs = False
+        wanted = min(batch_size, num_confs - mol.GetNumConformers())
+        batch += 1
+        if not list(AllChem.EmbedMultipleConfs(mol, numConfs=wanted, params=params)):
+            break  # nothing new: failed, or every conformer is a duplicate
+    if mol.GetNumConformers():
+        return [conf.GetId() for conf in mol.GetConformers()]
+
+    # Nothing embedded: one conformer from random coordinates in the time left
+    print(f"⚠️ Embedding fallback for {name}")
+    params = _embed_params(threads, RANDOM_SEED, deadline - time.monotonic())
+    params.useRandomCoords = True
+    params.maxIterations = 200
+    conf_ids = list(AllChem.EmbedMultipleConfs(mol, numConfs=1, params=params))
+    if not conf_ids:
+        raise RuntimeError("Embedding failed for molecule: " + name)
+    return conf_ids
+
+def optimize_conformers(mol, threads=EMBED_THREADS):
+    """UFF-optimize every conformer in parallel, returns the lowest-energy id"""
+    results = AllChem.UFFOptimizeMoleculeConfs(mol, numThreads=threads)
+    conf_ids = [conf.GetId() for conf in mol.GetConformers()]
+    best = min(range(len(results)), key=lambda i: results[i][1])
+    if results[best][0] != 0:
+        print("⚠️ Warning: Optimization not fully converged.")
+    return conf_ids[best]
+
+def build_molecule(smiles: str, name: str, progress=None) -> Molecule:
+    progress = progress or (lambda stage: None)
     mol = Chem.MolFromSmiles(smiles)
     if mol is None:
         raise ValueError(f"Invalid SMILES string: {smiles}")
 
+    progress("embed")
     mol = Chem.AddHs(mol)
-    if AllChem.EmbedMolecule(mol) != 0:
-        raise RuntimeError("Embedding failed for molecule: " + name)
+    embed_conformers(mol, name)
 
-    if AllChem.UFFOptimizeMolecule(mol) != 0:
-        print("⚠️ Warning: Optimization not fully converged.")
+    progress("optimize")
+    best = optimize_conformers(mol)
 
-    conf = mol.GetConformer()
-    atoms = []
-    for atom in mol.GetAtoms():
-        pos = conf.GetAtomPosition(atom.GetIdx())
-        atoms.append(f"{atom.GetSymbol()} {pos.x:.4f} {pos.y:.4f} {pos.z:.4f}")
+    return Molecule.from_rdkit(mol, name, smiles=smiles, conf_id=best)
 
-    os.makedirs("molecules", exist_ok=True)
-    xyz_path = f"molecules/{name}.xyz"
-    with open(xyz_path, "w") as f:
-        f.write(f"{len(atoms)}\n{name}\n" + "\n".join(atoms))
+def write_xyz(molecule: Molecule, xyz_path: str = None) -> str:
+    xyz_path = xyz_path or f"molecules/{molecule.name}.xyz"
+    write_frames(xyz_path, [(molecule.elements, molecule.coords, molecule.name)])
 
     print(f"✅ XYZ written: {xyz_path}")
     return xyz_path
+
+def generate_xyz(smiles: str, name: str) -> str:
+    return write_xyz(build_molecule(smiles, name))
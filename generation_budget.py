@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+
+# Seconds a single explanation may take, 0 disables the deadline
+LATENCY_BUDGET = float(os.environ.get("EXPLAIN_LATENCY_BUDGET", 8))
+# Never ask for fewer new tokens than this, even on a very slow host
+MIN_NEW_TOKENS = int(os.environ.get("EXPLAIN_MIN_NEW_TOKENS", 32))
+# Fraction of the remaining budget the token estimate may use
+SAFETY_FACTOR = 0.85
+
+
+def deadline_from_budget(budget=LATENCY_BUDGET):
+    return time.time() + budget if budget and budget > 0 else None
+
+
+class TokenRateMeter:
+    """Moving average of decode steps per second, used to size max_new_tokens"""
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.rate = None
+        self._lock = threading.Lock()
+
+    def record(self, steps, seconds):
+        if steps <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            rate = steps / seconds
+            self.rate = rate if self.rate is None else self.alpha * rate + (1 - self.alpha) * self.rate
+
+    def max_new_tokens(self, deadline, cap, floor=MIN_NEW_TOKENS):
+        """Tokens that fit before the deadline at the measured rate"""
+        if deadline is None or self.rate is None:
+            return cap
+        remaining = max(0.0, deadline - time.time())
+        return int(max(floor, min(cap, self.rate * remaining * SAFETY_FACTOR)))
+
+
+class DeadlineStop:
+    """Stopping criterion for model.generate that fires at a wall-clock deadline"""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.fired = False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        if self.deadline is not None and time.time() >= self.deadline:
+            self.fired = True
+        return self.fired
+
+    def as_list(self):
+        from transformers import StoppingCriteria, StoppingCriteriaList  # type: ignore
+
+        stop = self
+
+        class _Deadline(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return stop(input_ids, scores, **kwargs)
+
+        return StoppingCriteriaList([_Deadline()])
+
+
+def cutoff_reason(sequence, eos_token_id, max_new_tokens, cap, stop):
+    """Why generation of one output sequence ended"""
+    if eos_token_id is not None and bool((sequence == eos_token_id).any()):
+        return "eos"
+    if stop.fired:
+        return "deadline"
+    if max_new_tokens < cap:
+        return "token_budget"
+    return "max_length"
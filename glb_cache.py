@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+
+from rdkit import Chem  # type: ignore
+
+from lru_index import LRUIndex
+from workspace import publish_copy
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cache location and disk budget (override with env vars)
+CACHE_DIR = os.environ.get("GLB_CACHE_DIR", "cache/glb")
+CACHE_MAX_BYTES = int(os.environ.get("GLB_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Source files whose contents decide what a GLB looks like.
+# Editing any of them makes every existing cache entry stale.
+GENERATOR_FILES = [
+    "molecule.py",
+    "molecule_library.py",
+    "generate_xyz.py",
+    "blender_script_gen.py",
+    "blender_builder.py",
+    "export_glb_blender.py",
+    "gltf_writer.py",
+    "bond_geometry.py",
+]
+
+
+def canonical_smiles(smiles):
+    """Canonical SMILES so equivalent spellings share one cache entry"""
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        return smiles
+    return Chem.MolToSmiles(mol)
+
+
+def generator_fingerprint(files=None):
+    """Hash of the generator source code"""
+    digest = hashlib.sha256()
+    for name in files or GENERATOR_FILES:
+        path = os.path.join(BASE_DIR, name)
+        digest.update(name.encode())
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def settings_hash(settings):
+    """Stable hash of the generator settings dict"""
+    payload = json.dumps(settings or {}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class GLBCache:
+    """Content-addressed GLB store with LRU eviction by disk budget.
+
+    Safe to share between processes: every entry has its own metadata
+    file (see lru_index.py), so no process overwrites another's entries.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, generator_files=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.fingerprint = generator_fingerprint(generator_files)
+        os.makedirs(root, exist_ok=True)
+        self.index = LRUIndex(root, ".glb", max_bytes)
+
+    def key(self, smiles, settings=None):
+        """Cache key from canonical SMILES + settings hash"""
+        raw = canonical_smiles(smiles) + "|" + settings_hash(settings)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def path_for(self, key):
+        return self.index.path_for(key)
+
+    def _current(self, key, entry):
+        return (entry is not None and entry.get("generator") == self.fingerprint
+                and os.path.exists(self.path_for(key)))
+
+    def get(self, smiles, settings=None):
+        """Return the cached GLB path, or None on a miss or stale entry"""
+        key = self.key(smiles, settings)
+        entry = self.index.read(key)
+        if entry is None:
+            return None
+        if not self._current(key, entry):
+            print(f"♻️ Stale cache entry dropped: {entry.get('smiles')}")
+            self.index.remove(key)
+            return None
+        self.index.touch(key, entry)
+        return self.path_for(key)
+
+    def contains(self, smiles, settings=None):
+        """Read-only check for a current entry; doesn't count as a use"""
+        key = self.key(smiles, settings)
+        return self._current(key, self.index.read(key))
+
+    def put(self, smiles, settings, glb_path):
+        """Copy a freshly built GLB into the cache and enforce the budget"""
+        key = self.key(smiles, settings)
+        path = self.path_for(key)
+        publish_copy(glb_path, path)
+
+        self.index.write(key, {
+            "smiles": canonical_smiles(smiles),
+            "settings": settings_hash(settings),
+            "generator": self.fingerprint,
+            "size": os.path.getsize(path),
+            "hits": 0,
+        })
+        self.index.evict()
+        return path
+
+    def fetch(self, smiles, settings, dest_path):
+        """Copy a cached GLB to dest_path, returns True on a hit"""
+        cached = self.get(smiles, settings)
+        if cached is None:
+            return False
+        try:
+            # Readers of dest_path only ever see a complete file
+            publish_copy(cached, dest_path)
+        except FileNotFoundError:
+            return False  # evicted by another process in the meantime
+        return True
+
+    def total_bytes(self):
+        return self.index.total_bytes()
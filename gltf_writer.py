@@ -0,0 +1,267 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from molecule import Molecule, element_color
+from bond_geometry import molecule_bond_geometry
+
+# Same sizes as the Blender build script
+ATOM_RADIUS = 0.3
+BOND_RADIUS = 0.07
+BOND_COLOR = (0.8, 0.8, 0.8, 1)
+
+SPHERE_SEGMENTS = 24
+SPHERE_RINGS = 12
+CYLINDER_SEGMENTS = 16
+LOW_SPHERE_SEGMENTS = 10
+LOW_CYLINDER_SEGMENTS = 6
+
+# Molecule coordinates are Z-up like Blender's scene, glTF is Y-up: -90 degrees
+# about X, the same conversion Blender's exporter applies (export_yup)
+Z_UP_TO_Y_UP = [-0.7071067811865476, 0.0, 0.0, 0.7071067811865476]
+
+# Size optimizations (EXT_mesh_gpu_instancing / KHR_mesh_quantization)
+INSTANCING = os.environ.get("GLB_INSTANCING", "1") == "1"
+QUANTIZE = os.environ.get("GLB_QUANTIZE", "1") == "1"
+
+GLB_MAGIC = 0x46546C67  # b"glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+BYTE = 5120
+SHORT = 5122
+FLOAT = 5126
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+
+
+def uv_sphere(segments=SPHERE_SEGMENTS, rings=SPHERE_RINGS):
+    """Unit sphere: positions, normals, triangle indices"""
+    theta = np.linspace(0, np.pi, rings + 1)
+    phi = np.linspace(0, 2 * np.pi, segments + 1)
+    t, p = np.meshgrid(theta, phi, indexing="ij")
+    normals = np.stack([np.sin(t) * np.cos(p), np.sin(t) * np.sin(p), np.cos(t)], axis=-1)
+    normals = normals.reshape(-1, 3).astype(np.float32)
+
+    r, s = np.meshgrid(np.arange(rings), np.arange(segments), indexing="ij")
+    a = r * (segments + 1) + s
+    b = a + segments + 1
+    quads = np.stack([a, b, a + 1, a + 1, b, b + 1], axis=-1)
+    return normals.copy(), normals, quads.reshape(-1).astype(np.uint32)
+
+
+def cylinder(segments=CYLINDER_SEGMENTS):
+    """Unit-radius cylinder of height 1 along Z, centred on the origin"""
+    phi = np.linspace(0, 2 * np.pi, segments + 1)
+    ring = np.stack([np.cos(phi), np.sin(phi), np.zeros_like(phi)], axis=-1)
+    positions = np.concatenate([ring + [0, 0, -0.5], ring + [0, 0, 0.5]]).astype(np.float32)
+    normals = np.concatenate([ring, ring]).astype(np.float32)
+
+    s = np.arange(segments)
+    top = s + segments + 1
+    sides = np.stack([s, s + 1, top, top, s + 1, top + 1], axis=-1)
+    return positions, normals, sides.reshape(-1).astype(np.uint32)
+
+
+def tessellation(num_atoms, detail="high"):
+    """Sphere and cylinder segment counts, coarser for bigger molecules"""
+    if detail == "low":
+        return LOW_SPHERE_SEGMENTS, LOW_CYLINDER_SEGMENTS
+    segments = int(np.clip(SPHERE_SEGMENTS * np.sqrt(40 / max(num_atoms, 1)), 12, SPHERE_SEGMENTS))
+    return segments, max(8, min(CYLINDER_SEGMENTS, segments // 2 + 4))
+
+
+def low_detail_path(glb_path):
+    """outputs/x.glb -> outputs/x.low.glb"""
+    root, ext = os.path.splitext(glb_path)
+    return f"{root}.low{ext}"
+
+
+class _GLBBuilder:
+    def __init__(self):
+        self.gltf = {
+            "asset": {"version": "2.0", "generator": "gltf_writer.py"},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "materials": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+        }
+        self.blob = bytearray()
+
+    def use_extension(self, name):
+        # Neither extension has a fallback, so loaders must support them
+        for key in ("extensionsUsed", "extensionsRequired"):
+            if name not in self.gltf.setdefault(key, []):
+                self.gltf[key].append(name)
+
+    def _view(self, data, target=None, stride=None):
+        while len(self.blob) % 4:
+            self.blob.append(0)
+        view = {"buffer": 0, "byteOffset": len(self.blob), "byteLength": len(data)}
+        if target is not None:
+            view["target"] = target
+        if stride is not None:
+            view["byteStride"] = stride
+        self.gltf["bufferViews"].append(view)
+        self.blob.extend(data)
+        return len(self.gltf["bufferViews"]) - 1
+
+    def _accessor(self, view, component, count, kind, **extra):
+        self.gltf["accessors"].append({
+            "bufferView": view, "componentType": component, "count": count, "type": kind, **extra
+        })
+        return len(self.gltf["accessors"]) - 1
+
+    def _quantized(self, values, dtype, component):
+        # Normalized integers padded to 4 components so every vertex is 4-byte aligned
+        scale = np.iinfo(dtype).max
+        packed = np.zeros((len(values), 4), dtype=dtype)
+        packed[:, :3] = np.round(np.clip(values, -1, 1) * scale)
+        view = self._view(packed.tobytes(), ARRAY_BUFFER, stride=packed.itemsize * 4)
+        return view, packed[:, :3]
+
+    def add_geometry(self, positions, normals, indices, quantize=False):
+        if quantize:
+            # Unit geometry fits [-1, 1]: int16 positions, int8 normals
+            self.use_extension("KHR_mesh_quantization")
+            view, raw = self._quantized(positions, np.int16, SHORT)
+            pos = self._accessor(
+                view, SHORT, len(positions), "VEC3", normalized=True,
+                min=raw.min(axis=0).tolist(), max=raw.max(axis=0).tolist(),
+            )
+            view, _ = self._quantized(normals, np.int8, BYTE)
+            nrm = self._accessor(view, BYTE, len(normals), "VEC3", normalized=True)
+        else:
+            pos = self._accessor(
+                self._view(positions.astype(np.float32).tobytes(), ARRAY_BUFFER), FLOAT, len(positions), "VEC3",
+                min=positions.min(axis=0).tolist(), max=positions.max(axis=0).tolist(),
+            )
+            nrm = self._accessor(
+                self._view(normals.astype(np.float32).tobytes(), ARRAY_BUFFER), FLOAT, len(normals), "VEC3"
+            )
+        if indices.max() < 65536:
+            idx_data, idx_type = indices.astype(np.uint16).tobytes(), UNSIGNED_SHORT
+        else:
+            idx_data, idx_type = indices.astype(np.uint32).tobytes(), UNSIGNED_INT
+        idx = self._accessor(self._view(idx_data, ELEMENT_ARRAY_BUFFER), idx_type, len(indices), "SCALAR")
+        return {"attributes": {"POSITION": pos, "NORMAL": nrm}, "indices": idx}
+
+    def add_material(self, name, color):
+        self.gltf["materials"].append({
+            "name": name,
+            "pbrMetallicRoughness": {
+                "baseColorFactor": [float(c) for c in color], "metallicFactor": 0.0, "roughnessFactor": 0.5
+            },
+        })
+        return len(self.gltf["materials"]) - 1
+
+    def add_mesh(self, name, primitive, material):
+        self.gltf["meshes"].append({"name": name, "primitives": [dict(primitive, material=material)]})
+        return len(self.gltf["meshes"]) - 1
+
+    def add_node(self, **node):
+        self.gltf["nodes"].append(node)
+        self.gltf["scenes"][0]["nodes"].append(len(self.gltf["nodes"]) - 1)
+
+    def add_root(self, **node):
+        """Parent every top-level node under one new root node"""
+        scene = self.gltf["scenes"][0]
+        if scene["nodes"]:
+            node["children"] = scene["nodes"]
+        self.gltf["nodes"].append(node)
+        scene["nodes"] = [len(self.gltf["nodes"]) - 1]
+
+    def add_instances(self, name, mesh, translations, rotations, scales):
+        """One node drawing `mesh` once per row of the transform arrays"""
+        self.use_extension("EXT_mesh_gpu_instancing")
+        attributes = {}
+        for key, values, kind in (("TRANSLATION", translations, "VEC3"),
+                                  ("ROTATION", rotations, "VEC4"),
+                                  ("SCALE", scales, "VEC3")):
+            data = np.ascontiguousarray(values, dtype=np.float32)
+            attributes[key] = self._accessor(self._view(data.tobytes()), FLOAT, len(data), kind)
+        self.add_node(name=name, mesh=mesh, extensions={"EXT_mesh_gpu_instancing": {"attributes": attributes}})
+
+    def to_bytes(self):
+        while len(self.blob) % 4:
+            self.blob.append(0)
+        self.gltf["buffers"] = [{"byteLength": len(self.blob)}]
+        for key in ("nodes", "meshes", "materials", "accessors", "bufferViews"):
+            if not self.gltf[key]:
+                del self.gltf[key]
+
+        json_chunk = json.dumps(self.gltf, separators=(",", ":")).encode()
+        json_chunk += b" " * (-len(json_chunk) % 4)
+        total = 12 + 8 + len(json_chunk) + 8 + len(self.blob)
+        return b"".join([
+            struct.pack("<III", GLB_MAGIC, 2, total),
+            struct.pack("<II", len(json_chunk), CHUNK_JSON), json_chunk,
+            struct.pack("<II", len(self.blob), CHUNK_BIN), bytes(self.blob),
+        ])
+
+
+def molecule_to_glb(molecule: Molecule, detail="high", instancing=INSTANCING, quantize=QUANTIZE) -> bytes:
+    """Ball-and-stick model as binary glTF 2.0.
+
+    detail="low" drops hydrogens and uses coarse spheres, for a quick
+    first load before the full model.
+    """
+    if detail == "low":
+        molecule = molecule.without_hydrogens()
+
+    builder = _GLBBuilder()
+    sphere_segments, cylinder_segments = tessellation(molecule.num_atoms, detail)
+    sphere = builder.add_geometry(*uv_sphere(sphere_segments, sphere_segments // 2), quantize=quantize)
+    rod = builder.add_geometry(*cylinder(cylinder_segments), quantize=quantize)
+
+    # One mesh per element, all sharing the sphere geometry
+    element_meshes = {}
+    for el in sorted(set(molecule.elements)):
+        material = builder.add_material(el, element_color(el))
+        element_meshes[el] = builder.add_mesh(f"Atom_{el}", sphere, material)
+
+    elements = np.array(molecule.elements)
+    if instancing:
+        for el, mesh in element_meshes.items():
+            coords = molecule.coords[elements == el]
+            rotations = np.tile([0.0, 0.0, 0.0, 1.0], (len(coords), 1))
+            scales = np.full((len(coords), 3), ATOM_RADIUS)
+            builder.add_instances(f"Atoms_{el}", mesh, coords, rotations, scales)
+    else:
+        for i, (el, xyz) in enumerate(zip(molecule.elements, molecule.coords)):
+            builder.add_node(
+                name=f"{el}{i}", mesh=element_meshes[el],
+                translation=[float(v) for v in xyz], scale=[ATOM_RADIUS] * 3,
+            )
+
+    bonds = molecule_bond_geometry(molecule)
+    if len(bonds):
+        bond_mesh = builder.add_mesh("Bond", rod, builder.add_material("Bond", BOND_COLOR))
+        scales = np.column_stack([np.full_like(bonds.lengths, BOND_RADIUS),
+                                  np.full_like(bonds.lengths, BOND_RADIUS), bonds.lengths])
+        if instancing:
+            builder.add_instances("Bonds", bond_mesh, bonds.positions, bonds.rotations, scales)
+        else:
+            for i, (mid, quat, scale) in enumerate(zip(bonds.positions.tolist(), bonds.rotations.tolist(),
+                                                       scales.tolist())):
+                builder.add_node(name=f"Bond{i}", mesh=bond_mesh, translation=mid, rotation=quat, scale=scale)
+
+    # Same orientation as the Blender export, so swapping preview and full model doesn't rotate it
+    builder.add_root(name=molecule.name or "Molecule", rotation=Z_UP_TO_Y_UP)
+    return builder.to_bytes()
+
+
+def write_glb(molecule: Molecule, glb_path: str, **options) -> str:
+    os.makedirs(os.path.dirname(glb_path) or ".", exist_ok=True)
+    with open(glb_path, "wb") as f:
+        f.write(molecule_to_glb(molecule, **options))
+
+    print(f"✅ GLB written: {glb_path}")
+    return glb_path
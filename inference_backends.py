@@ -0,0 +1,125 @@
+import os
+import time
+
+from model_registry import rss_bytes
+
+# Which explainer backend to load: "torch" (fp32), "torch-int8" (dynamic
+# quantization of the Linear layers) or "onnx" (ONNX Runtime with KV-cache)
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch")
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+# 0 keeps the library default
+INTRA_OP_THREADS = int(os.environ.get("INFER_INTRA_OP_THREADS", 0))
+INTER_OP_THREADS = int(os.environ.get("INFER_INTER_OP_THREADS", 0))
+
+_threads_configured = False
+
+
+def configure_torch_threads(intra_op=INTRA_OP_THREADS, inter_op=INTER_OP_THREADS):
+    # set_num_interop_threads may only be called once, before any parallel work
+    global _threads_configured
+    import torch
+    if intra_op:
+        torch.set_num_threads(intra_op)
+    if inter_op and not _threads_configured:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            print("⚠️ Inter-op threads already fixed for this process")
+    _threads_configured = True
+
+
+def _load_torch(model_path, quantize=False):
+    import torch
+    from transformers import T5ForConditionalGeneration  # type: ignore
+
+    configure_torch_threads()
+    model = T5ForConditionalGeneration.from_pretrained(model_path)
+    model.eval()
+    if quantize:
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def _load_onnx(model_path, intra_op=INTRA_OP_THREADS, inter_op=INTER_OP_THREADS):
+    import onnxruntime as ort  # type: ignore
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM  # type: ignore
+
+    options = ort.SessionOptions()
+    if intra_op:
+        options.intra_op_num_threads = intra_op
+    if inter_op:
+        options.inter_op_num_threads = inter_op
+
+    # Export encoder/decoder (with past key values) once and reuse it
+    onnx_dir = model_path.rstrip("/\\") + "-onnx"
+    if os.path.exists(os.path.join(onnx_dir, "config.json")):
+        return ORTModelForSeq2SeqLM.from_pretrained(onnx_dir, use_cache=True, session_options=options)
+
+    print(f"⏳ Exporting {model_path} to ONNX: {onnx_dir}")
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_path, export=True, use_cache=True, session_options=options)
+    model.save_pretrained(onnx_dir)
+    return model
+
+
+def load_backend(model_path, backend=INFERENCE_BACKEND):
+    """Tokenizer and a model with the transformers generate() API"""
+    from transformers import T5Tokenizer  # type: ignore
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend} (choose from {', '.join(BACKENDS)})")
+
+    tokenizer = T5Tokenizer.from_pretrained(model_path)
+    if backend == "onnx":
+        model = _load_onnx(model_path)
+    else:
+        model = _load_torch(model_path, quantize=backend == "torch-int8")
+    print(f"🧠 Inference backend: {backend}")
+    return tokenizer, model
+
+
+def benchmark(model_path, prompts, generation_params, backends=BACKENDS, runs=1):
+    """Latency, tokens/s and memory of each backend over the given prompts"""
+    import torch
+
+    results = []
+    for backend in backends:
+        rss_before = rss_bytes()
+        start = time.time()
+        try:
+            tokenizer, model = load_backend(model_path, backend)
+        except ImportError as e:
+            print(f"⚠️ Skipping {backend}: {e}")
+            continue
+        load_seconds = time.time() - start
+        rss_loaded = rss_bytes()
+
+        torch.manual_seed(0)
+        latencies = []
+        tokens = 0
+        for _ in range(runs):
+            for prompt in prompts:
+                inputs = tokenizer(prompt, return_tensors="pt")
+                start = time.time()
+                with torch.no_grad():
+                    output = model.generate(**inputs, **generation_params)
+                latencies.append(time.time() - start)
+                tokens += int((output[0] != tokenizer.pad_token_id).sum())
+
+        latencies.sort()
+        rss_after = rss_bytes()
+        result = {
+            "backend": backend,
+            "load_seconds": round(load_seconds, 2),
+            "prompts": len(latencies),
+            "mean_latency": round(sum(latencies) / len(latencies), 3),
+            "p95_latency": round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+            "tokens_per_second": round(tokens / sum(latencies), 1),
+            "model_rss_mb": round((rss_loaded - rss_before) / 2**20, 1) if rss_before and rss_loaded else None,
+            "rss_mb": round(rss_after / 2**20, 1) if rss_after else None,
+        }
+        results.append(result)
+        print(f"📊 {backend}: {result['mean_latency']}s mean, {result['p95_latency']}s p95, "
+              f"{result['tokens_per_second']} tok/s, {result['model_rss_mb']} MB model")
+        del model, tokenizer
+    return results
@@ -0,0 +1,152 @@
+"""Per-entry metadata and LRU eviction for the on-disk caches.
+
+Each cache entry is a data file in the cache directory plus a small JSON
+metadata file under meta/. Processes sharing one directory never rewrite
+each other's entries, and eviction scans the directory itself under a
+cross-process lock, so files without metadata still count toward the
+budget. The metadata file's mtime is the entry's last use.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from workspace import atomic_path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt  # type: ignore
+except ImportError:
+    msvcrt = None
+
+# Hits refresh an entry's last use at most this often (seconds)
+TOUCH_INTERVAL = float(os.environ.get("CACHE_TOUCH_INTERVAL", 60))
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock shared by every process using the same path"""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_json_atomic(path, data):
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class LRUIndex:
+    """Metadata files and budget enforcement for `<key><suffix>` data files"""
+
+    def __init__(self, root, suffix, max_bytes):
+        self.root = root
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.meta_dir = os.path.join(root, "meta")
+        self.lock_path = os.path.join(root, ".lock")
+        self._lock = threading.Lock()
+        self._pending_hits = {}
+        os.makedirs(self.meta_dir, exist_ok=True)
+        # Single shared index from older versions, superseded by meta/
+        _remove_file(os.path.join(root, "index.json"))
+
+    def path_for(self, key):
+        return os.path.join(self.root, f"{key}{self.suffix}")
+
+    def meta_path(self, key):
+        return os.path.join(self.meta_dir, f"{key}.json")
+
+    def read(self, key):
+        """Metadata dict of an entry, None when it has none"""
+        try:
+            with open(self.meta_path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, key, meta):
+        """Store metadata for a freshly written data file"""
+        now = time.time()
+        meta.setdefault("created", now)
+        meta["last_used"] = now
+        write_json_atomic(self.meta_path(key), meta)
+        return meta
+
+    def touch(self, key, meta):
+        """Record a hit; the metadata is rewritten at most once per TOUCH_INTERVAL"""
+        with self._lock:
+            hits = self._pending_hits.pop(key, 0) + 1
+            if time.time() - meta.get("last_used", 0) < TOUCH_INTERVAL:
+                self._pending_hits[key] = hits
+                return
+        meta["hits"] = meta.get("hits", 0) + hits
+        self.write(key, meta)
+
+    def remove(self, key):
+        _remove_file(self.path_for(key))
+        _remove_file(self.meta_path(key))
+
+    def entries(self):
+        """(last_used, size, key) of every data file on disk"""
+        meta_mtimes = {}
+        for entry in os.scandir(self.meta_dir):
+            if entry.name.endswith(".json") and entry.is_file():
+                meta_mtimes[entry.name[:-len(".json")]] = entry.stat().st_mtime
+
+        found = []
+        for entry in os.scandir(self.root):
+            if not entry.name.endswith(self.suffix) or not entry.is_file():
+                continue
+            key = entry.name[:-len(self.suffix)]
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            # Files without metadata are aged by their own mtime
+            found.append((meta_mtimes.pop(key, stat.st_mtime), stat.st_size, key))
+
+        # Metadata whose data file is gone
+        for key in meta_mtimes:
+            _remove_file(self.meta_path(key))
+        return found
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Drop least recently used entries until the directory fits the budget"""
+        removed = 0
+        with file_lock(self.lock_path):
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, key in entries:
+                if total <= self.max_bytes:
+                    break
+                self.remove(key)
+                total -= size
+                removed += 1
+        return removed
@@ -1,76 +1,203 @@
+import hashlib
+import json
 import os
+import tempfile
 import time
 import traceback
-from flask import Flask, render_template, request, jsonify, send_from_directory
+import click
+from werkzeug.utils import secure_filename
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 
-from generate_xyz import generate_xyz
-from blender_script_gen import generate_blender_py
-from export_glb_blender import run_blender_script
+from molecule_pipeline import build_molecule_glb, build_structure_glb, glb_path_for, artifacts
+from workspace import publish
+from build_jobs import BuildJobManager, format_sse
+from molecule_db import molecule_db
+from explanation_cache import ExplanationCache
+from model_registry import ModelRegistry
+from batch_inference import BatchGenerator
+from generation_budget import LATENCY_BUDGET, TokenRateMeter, DeadlineStop, cutoff_reason, deadline_from_budget
+from inference_backends import INFERENCE_BACKEND, BACKENDS, load_backend, benchmark
+from metrics import metrics, timed
 
-# LLM (Offline)
-from transformers import T5Tokenizer, T5ForConditionalGeneration
-import torch
-
-# Load model and tokenizer from local directory
+# LLM (Offline), loaded once through the registry so the 3D path can
+# serve requests while the model is still loading
 MODEL_PATH = "models/flan-t5-base"
-tokenizer = T5Tokenizer.from_pretrained(MODEL_PATH)
-model = T5ForConditionalGeneration.from_pretrained(MODEL_PATH)
-from transformers import T5Tokenizer, T5ForConditionalGeneration # type: ignore
+# "background" warms the model up at startup, "lazy" loads it on first use
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "background")
+
+def load_flan_t5():
+    return load_backend(MODEL_PATH, INFERENCE_BACKEND)
 
-tokenizer = T5Tokenizer.from_pretrained("models/flan-t5-base")
-model = T5ForConditionalGeneration.from_pretrained("models/flan-t5-base")
+models = ModelRegistry()
+models.register("flan-t5", load_flan_t5)
+if MODEL_WARMUP == "background":
+    models.warm_up()
 
 app = Flask(__name__)
 
-# Molecule SMILES dictionary
-molecule_db = {
-    "water":"H2O",
-    "methane": "C", "ethane": "CC", "propane": "CCC", "butane": "CCCC", "pentane": "CCCCC",
-    "hexane": "CCCCCC", "ethene": "C=C", "ethyne": "C#C", "benzene": "c1ccccc1", "methanol": "CO",
-    "ethanol": "CCO", "propanol": "CCCO", "butanol": "CCCCO", "isopropanol": "CC(O)C",
-    "glycerol": "C(C(CO)O)O", "formic acid": "C(=O)O", "acetic acid": "CC(=O)O", "propanoic acid": "CCC(=O)O",
-    "butanoic acid": "CCCC(=O)O", "benzoic acid": "c1ccc(cc1)C(=O)O", "methylamine": "CN",
-    "ethylamine": "CCN", "aniline": "c1ccccc1N", "formaldehyde": "C=O", "acetaldehyde": "CC=O",
-    "acetone": "CC(=O)C", "glucose": "OC[C@H]1O[C@@H](O)[C@H](O)[C@@H](O)[C@H]1O",
-    "fructose": "C(C1C(C(C(C(O1)(CO))O)O)O)=O", "sucrose": "OCC1OC(O)C(O)C(O)C1OC2(C(C(C(C(O2)CO)O)O)O)",
-    "glycine": "NCC(=O)O", "alanine": "CC(C(=O)O)N", "valine": "CC(C)C(C(=O)O)N", "leucine": "CC(C)CC(C(=O)O)N",
-    "phenylalanine": "C1=CC=C(C=C1)CC(C(=O)O)N", "tryptophan": "C1=CC=C2C(=C1)C(=CN2)CC(C(=O)O)N",
-    "ammonia": "N", "carbon dioxide": "O=C=O", "nitric acid": "O=N(=O)O", "sulfuric acid": "OS(=O)(=O)O",
-    "phosphoric acid": "OP(=O)(O)O", "hydrogen peroxide": "OO", "ozone": "O=O[O]",
-    "adenine": "C1=NC2=C(N1)N=CN2", "guanine": "C1=NC2=C(N1)C(=O)N=CN2", "cytosine": "C1=CN=CN1",
-    "uracil": "C1=CC(=O)NC(=O)N1", "thymine": "CC1=CN(C(=O)NC1=O)C", 
-    "cholesterol": "C[C@H](CCC(=O)O)C1CCC2C3CCC4=CC(=O)CCC4(C)C3CCC12C",
-    "caffeine": "CN1C=NC2=C1C(=O)N(C(=O)N2C)C", "nicotine": "CN1CCCC1C2=CN=CC=C2",
-    "oxygen": "O=O", "hydrogen": "[H][H]", "nitrogen": "N#N", "chlorine": "ClCl", "fluorine": "F[F]",
-    "aspirin": "CC(=O)Oc1ccccc1C(=O)O", "paracetamol": "CC(=O)NC1=CC=C(C=C1)O",
-    "acetylsalicylic acid": "CC(=O)Oc1ccccc1C(=O)O"
+# Molecule explanation generator using LLM
+EXPLAIN_PROMPT = (
+    "You are a chemistry expert. Write a detailed explanation about the molecule '{molecule}'that a school student can easily understand, including:\n"
+    "- Its molecular structure and chemical formula\n"
+    "- Functional groups present\n"
+    "- Physical and chemical properties\n"
+    "- Common uses in real life or industry\n"
+    "- Any biological or environmental relevance\n\n"
+    "Start your explanation now:"
+)
+GENERATION_PARAMS = {
+    "max_length": 400,
+    "temperature": 0.9,
+    "top_k": 50,
+    "top_p": 0.95,
+    "do_sample": True,
+    "num_return_sequences": 1,
+    "repetition_penalty": 1.3,
 }
+explanation_cache = ExplanationCache()
 
-# Molecule explanation generator using LLM
-def explain_molecule(molecule: str) -> str:
-    prompt = (
-        f"You are a chemistry expert. Write a detailed explanation about the molecule '{molecule}'that a school student can easily understand, including:\n"
-        f"- Its molecular structure and chemical formula\n"
-        f"- Functional groups present\n"
-        f"- Physical and chemical properties\n"
-        f"- Common uses in real life or industry\n"
-        f"- Any biological or environmental relevance\n\n"
-        f"Start your explanation now:"
-    )
+token_meter = TokenRateMeter()
+# Only complete explanations are worth caching
+COMPLETE_REASONS = ("eos", "max_length")
 
-    input_ids = tokenizer(prompt, return_tensors="pt").input_ids
-    output = model.generate(
-        input_ids,
-        max_length=400,
-        temperature=0.9,
-        top_k=50,
-        top_p=0.95,
-        do_sample=True,
-        num_return_sequences=1,
-        repetition_penalty=1.3
-    )
-    explanation = tokenizer.decode(output[0], skip_special_tokens=True)
-    return explanation
+def generation_settings(deadline):
+    """GENERATION_PARAMS with max_new_tokens sized to fit the deadline"""
+    params = dict(GENERATION_PARAMS)
+    cap = params.pop("max_length")
+    params["max_new_tokens"] = token_meter.max_new_tokens(deadline, cap)
+    return params, cap
+
+def describe_output(tokenizer, output, params, cap, stop, elapsed):
+    token_meter.record(output.shape[1] - 1, elapsed)
+    return [
+        {
+            "text": tokenizer.decode(seq, skip_special_tokens=True),
+            "reason": cutoff_reason(seq, tokenizer.eos_token_id, params["max_new_tokens"], cap, stop),
+            "tokens": int((seq != tokenizer.pad_token_id).sum()),
+            "seconds": round(elapsed, 3),
+        }
+        for seq in output
+    ]
+
+class BatchStreamer:
+    """Streamer for a batched generate call, passing each row's new text to its own callback"""
+
+    def __init__(self, tokenizer, callbacks):
+        self.tokenizer = tokenizer
+        self.callbacks = callbacks
+        self.tokens = [[] for _ in callbacks]
+        self.sent = [""] * len(callbacks)
+        self.started = False
+
+    def put(self, value):
+        if not self.started:  # decoder start tokens, not output
+            self.started = True
+            return
+        for row, token in enumerate(value.reshape(len(self.callbacks), -1)[:, -1].tolist()):
+            if self.callbacks[row] is None:
+                continue
+            self.tokens[row].append(token)
+            text = self.tokenizer.decode(self.tokens[row], skip_special_tokens=True)
+            if len(text) > len(self.sent[row]) and text.startswith(self.sent[row]):
+                self.callbacks[row](text[len(self.sent[row]):])
+                self.sent[row] = text
+
+    def end(self):
+        pass
+
+def generate_explanations(requests):
+    """One padded, batched generate call for several (prompt, deadline, publish) requests"""
+    import torch
+    tokenizer, model = models.get("flan-t5")
+    deadlines = [deadline for _, deadline, _ in requests if deadline]
+    stop = DeadlineStop(min(deadlines) if deadlines else None)
+    params, cap = generation_settings(stop.deadline)
+
+    callbacks = [publish for _, _, publish in requests]
+    if any(callbacks):
+        params["streamer"] = BatchStreamer(tokenizer, callbacks)
+    inputs = tokenizer([prompt for prompt, _, _ in requests], return_tensors="pt", padding=True)
+    start = time.time()
+    with torch.no_grad():
+        output = model.generate(**inputs, stopping_criteria=stop.as_list(), **params)
+    return describe_output(tokenizer, output, params, cap, stop, time.time() - start)
+
+explain_batcher = BatchGenerator(generate_explanations)
+
+def generate_explanation(molecule: str, deadline=None, publish=None) -> dict:
+    """Batched generation; publish (if given) receives the text as it is generated"""
+    return explain_batcher.generate((EXPLAIN_PROMPT.format(molecule=molecule), deadline, publish))
+
+def explain_molecule(molecule: str, budget=LATENCY_BUDGET, publish=None) -> dict:
+    """Explanation text plus why generation stopped ("cached" on a cache hit)"""
+    with timed("explain_molecule", molecule=molecule):
+        explanation = explanation_cache.get(molecule, EXPLAIN_PROMPT, GENERATION_PARAMS)
+        if explanation is not None:
+            return {"text": explanation, "reason": "cached"}
+
+        with timed("explain_generate", molecule=molecule):
+            result = generate_explanation(molecule, deadline_from_budget(budget), publish)
+        if result["reason"] in COMPLETE_REASONS:
+            explanation_cache.add(molecule, EXPLAIN_PROMPT, GENERATION_PARAMS, result["text"])
+        return result
+
+@app.cli.command("pregenerate-explanations")
+@click.option("--variants", type=int, default=None, help="Explanations to keep per molecule")
+def pregenerate_explanations(variants):
+    """Fill the explanation cache for every molecule in molecule_db"""
+    target = variants or explanation_cache.variants
+    explanation_cache.variants = max(explanation_cache.variants, target)
+    for name in molecule_db:
+        while explanation_cache.count(name, EXPLAIN_PROMPT, GENERATION_PARAMS) < target:
+            start = time.time()
+            result = generate_explanation(name)
+            explanation_cache.add(name, EXPLAIN_PROMPT, GENERATION_PARAMS, result["text"])
+            print(f"✅ {name}: {time.time() - start:.1f}s")
+    print(f"🏁 Explanations cached for {len(molecule_db)} molecules")
+
+@app.cli.command("bench-explainer")
+@click.option("--backend", "backends", multiple=True, type=click.Choice(BACKENDS), help="Backends to compare (default: all)")
+@click.option("--limit", type=int, default=None, help="Only use the first N molecule_db prompts")
+@click.option("--runs", type=int, default=1)
+@click.option("--output", type=click.Path(), default=None, help="Write results as JSON")
+def bench_explainer(backends, limit, runs, output):
+    """Compare explainer inference backends on the molecule_db prompts
+
+    Run with MODEL_WARMUP=lazy so the serving model is not loaded as well.
+    """
+    prompts = [EXPLAIN_PROMPT.format(molecule=name) for name in list(molecule_db)[:limit]]
+    results = benchmark(MODEL_PATH, prompts, GENERATION_PARAMS, backends or BACKENDS, runs)
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+def build_for_viewer(name, smiles, progress):
+    build_molecule_glb(name, smiles, progress=progress)
+    return {"viewer_url": f"/viewer/{name}"}
+
+build_jobs = BuildJobManager(build_for_viewer, name="glb")
+
+# Explanations are prefetched alongside the 3D build so the viewer finds
+# them ready; both branches are single-flight and cached independently
+EXPLAIN_PREFETCH = os.environ.get("EXPLAIN_PREFETCH", "1") == "1"
+
+def explain_job(name, progress, publish):
+    """Explanation for a prefetch or a streaming viewer, publishing text as it is generated"""
+    progress("explain")
+    start = time.perf_counter()
+    first = []
+
+    def publish_timed(text):
+        if not first:
+            first.append(True)
+            metrics.observe("explain_first_token", time.perf_counter() - start, molecule=name)
+        publish(text)
+
+    with timed("explain_stream", molecule=name):
+        return explain_molecule(name, publish=publish_timed)
+
+explain_jobs = BuildJobManager(explain_job, max_workers=explain_batcher.max_batch_size,
+                               name="explain", partial=True)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -78,22 +205,16 @@ def index():
         try:
             name = request.form['molecule'].strip().lower()
             if name in molecule_db:
-                smiles = molecule_db[name]
-                os.makedirs('outputs', exist_ok=True)
-
-                xyz_path = generate_xyz(smiles, name)
-                blender_script = generate_blender_py(xyz_path, name)
-                run_blender_script(blender_script)
-
-                glb_path = f"outputs/{name}.glb"
-                for _ in range(40):  # wait up to 20 seconds
-                    if os.path.exists(glb_path):
-                        print(f"✅ File created: {glb_path}")
-                        return jsonify(success=True, viewer_url=f"/viewer/{name}")
-                    time.sleep(0.5)
-
-                print(f"❌ GLB file not created: {glb_path}")
-                return jsonify(success=False, error="Failed to generate 3D model.")
+                job = build_jobs.submit(name, molecule_db[name])
+                explain_job = explain_jobs.submit(name) if EXPLAIN_PREFETCH else None
+                return jsonify(
+                    success=True,
+                    job_id=job.id,
+                    explain_job_id=explain_job.id if explain_job else None,
+                    status_url=f"/jobs/{job.id}",
+                    events_url=f"/jobs/{job.id}/events",
+                    viewer_url=f"/viewer/{name}",
+                )
             else:
                 return jsonify(success=False, error="Invalid molecule name.")
         except Exception as e:
@@ -102,18 +223,186 @@ def index():
             return jsonify(success=False, error=str(e))
     return render_template('index.html')
 
+# Coordinate-only structures (XYZ / PDB uploads), bonds are perceived.
+# Uploads are stored and published under their content hash, so they
+# never replace a curated molecule and identical uploads share one build
+UPLOAD_DIR = "uploads"
+UPLOAD_PREFIX = "upload-"
+STRUCTURE_EXTENSIONS = (".xyz", ".pdb", ".ent")
+STRUCTURE_MAX_BYTES = int(os.environ.get("STRUCTURE_MAX_BYTES", 64 * 1024 * 1024))
+
+def save_upload(upload, ext):
+    """Store an upload under its content hash, returns (upload id, path)"""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    digest = hashlib.sha256(ext.encode())
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=UPLOAD_DIR)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter(lambda: upload.stream.read(1024 * 1024), b""):
+                size += len(chunk)
+                if size > STRUCTURE_MAX_BYTES:
+                    raise OverflowError("Structure file too large.")
+                digest.update(chunk)
+                f.write(chunk)
+        upload_id = UPLOAD_PREFIX + digest.hexdigest()[:16]
+        return upload_id, publish(tmp_path, os.path.join(UPLOAD_DIR, upload_id + ext))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def build_structure_for_viewer(upload_id, path, label, progress):
+    build_structure_glb(upload_id, path, label=label, progress=progress)
+    return {"viewer_url": f"/viewer/{upload_id}"}
+
+structure_jobs = BuildJobManager(build_structure_for_viewer, name="structure")
+
+@app.route('/structures', methods=['POST'])
+def upload_structure():
+    upload = request.files.get('structure')
+    if upload is None or not upload.filename:
+        return jsonify(success=False, error="No structure file."), 400
+    if request.content_length and request.content_length > STRUCTURE_MAX_BYTES:
+        return jsonify(success=False, error="Structure file too large."), 413
+
+    stem, ext = os.path.splitext(secure_filename(upload.filename).lower())
+    if ext not in STRUCTURE_EXTENSIONS:
+        return jsonify(success=False, error=f"Unsupported file type (use {', '.join(STRUCTURE_EXTENSIONS)})."), 400
+    label = secure_filename(request.form.get('name', '')).lower() or stem
+
+    try:
+        upload_id, path = save_upload(upload, ext)
+    except OverflowError as e:
+        return jsonify(success=False, error=str(e)), 413
+    job = structure_jobs.submit(upload_id, path, label)
+    return jsonify(
+        success=True,
+        job_id=job.id,
+        upload_id=upload_id,
+        status_url=f"/jobs/{job.id}",
+        events_url=f"/jobs/{job.id}/events",
+        viewer_url=f"/viewer/{upload_id}",
+    )
+
+def find_job(job_id):
+    return build_jobs.get(job_id) or explain_jobs.get(job_id) or structure_jobs.get(job_id)
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = find_job(job_id)
+    if job is None:
+        return jsonify(success=False, error="Unknown job."), 404
+    return jsonify(success=True, **job.to_dict())
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    job = find_job(job_id)
+    if job is None:
+        return jsonify(success=False, error="Unknown job."), 404
+    return Response(
+        stream_with_context(job.sse_stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route('/health')
+def health():
+    return jsonify(
+        inference_backend=INFERENCE_BACKEND,
+        decode_steps_per_second=token_meter.rate,
+        explainer_batching=explain_batcher.stats(),
+        stages=metrics.snapshot(),
+        **models.status(),
+    )
+
+def explainable(molecule):
+    """Only known molecules (curated or already built) may start LLM work"""
+    if molecule.startswith(UPLOAD_PREFIX):
+        return False
+    return molecule in molecule_db or os.path.exists(glb_path_for(molecule))
+
+@app.route('/explain/<molecule>')
+def explain(molecule):
+    if not explainable(molecule):
+        return jsonify(success=False, error="Unknown molecule."), 404
+    budget = request.args.get("budget", LATENCY_BUDGET, type=float)
+    try:
+        return jsonify(success=True, molecule=molecule, **explain_molecule(molecule, budget))
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify(success=False, error=str(e)), 500
+
+def relay_explanation(job, heartbeat=15):
+    """SSE events for an explain job: its text as it is generated, then the result"""
+    sent = 0
+    while True:
+        pieces = job.wait_partial(sent, timeout=heartbeat)
+        if pieces:
+            sent += len(pieces)
+            yield format_sse("token", {"text": "".join(pieces)})
+        elif job.done:
+            break
+        else:
+            yield ": keep-alive\n\n"
+
+    if job.state == "failed":
+        yield format_sse("error", {"error": job.error})
+        return
+    if not sent:
+        yield format_sse("token", {"text": job.result["text"]})
+    yield format_sse("done", job.result)
+
+@app.route('/explain/<molecule>/stream')
+def explain_stream(molecule):
+    if not explainable(molecule):
+        return jsonify(success=False, error="Unknown molecule."), 404
+
+    def events():
+        # Follow a running explain job, or reuse a recent one (even if cut off)
+        # instead of starting a second generation
+        job = explain_jobs.latest(molecule)
+        if job is not None:
+            yield from relay_explanation(job)
+            return
+
+        cached = explanation_cache.get(molecule, EXPLAIN_PROMPT, GENERATION_PARAMS)
+        if cached is not None:
+            yield format_sse("token", {"text": cached})
+            yield format_sse("done", {"text": cached, "reason": "cached"})
+            return
+
+        # Single-flight and micro-batched: later viewers and a prefetch join this job
+        yield from relay_explanation(explain_jobs.submit(molecule))
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.route('/viewer/<molecule>')
 def viewer(molecule):
     glb_file = f"outputs/{molecule}.glb"
     if not os.path.exists(glb_file):
         return f"File not found: {glb_file}", 404
 
-    explanation = explain_molecule(molecule)
-    return render_template("viewer.html", molecule=molecule, explanation=explanation)
+    # Render right away, the page streams the explanation if it isn't cached
+    if molecule.startswith(UPLOAD_PREFIX):
+        explanation = "Uploaded structure; bonds were perceived from atom distances."
+    else:
+        explanation = explanation_cache.get(molecule, EXPLAIN_PROMPT, GENERATION_PARAMS)
+    glb_url = artifacts.url(f"{molecule}.glb")
+    low_url = artifacts.url(f"{molecule}.low.glb") if os.path.exists(f"outputs/{molecule}.low.glb") else None
+    return render_template("viewer.html", molecule=molecule, explanation=explanation,
+                           glb_url=glb_url, low_url=low_url)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
 
 @app.route('/outputs/<path:filename>')
 def serve_outputs(filename):
-    return send_from_directory("outputs", filename)
+    return artifacts.serve(filename)
 
 if __name__ == '__main__':
     app.run(debug=True, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Per-stage latency metrics for the molecule pipeline.
+
+Every instrumented stage records a latency histogram and an error count,
+rendered in Prometheus text format on /metrics. Each observation is also
+written as one JSON log line on the "molecule.metrics" logger.
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# JSON lines on stderr, METRICS_LOG=0 keeps only the /metrics endpoint
+METRICS_LOG = os.environ.get("METRICS_LOG", "1") == "1"
+
+logger = logging.getLogger("molecule.metrics")
+if METRICS_LOG and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+
+
+class StageMetrics:
+    """Thread-safe histograms keyed by stage name"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, error=False, **fields):
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = _Histogram(self.buckets)
+            hist.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            hist.sum += seconds
+            hist.count += 1
+            hist.errors += bool(error)
+
+        if METRICS_LOG:
+            record = {"ts": round(time.time(), 3), "stage": stage, "seconds": round(seconds, 4),
+                      "status": "error" if error else "ok", **fields}
+            logger.info(json.dumps(record, default=str))
+
+    @contextmanager
+    def timed(self, stage, **fields):
+        """Time the with-block; exceptions count as errors and propagate"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.observe(stage, time.perf_counter() - start, error=True, error_type=type(e).__name__, **fields)
+            raise
+        self.observe(stage, time.perf_counter() - start, **fields)
+
+    def snapshot(self):
+        """{stage: {"count", "sum", "errors"}} for JSON status pages"""
+        with self._lock:
+            return {
+                stage: {"count": h.count, "sum": round(h.sum, 4), "errors": h.errors}
+                for stage, h in sorted(self._stages.items())
+            }
+
+    def render_prometheus(self):
+        with self._lock:
+            stages = [(name, list(h.counts), h.sum, h.count, h.errors) for name, h in sorted(self._stages.items())]
+
+        lines = [
+            "# HELP molecule_stage_seconds Time spent in each pipeline stage.",
+            "# TYPE molecule_stage_seconds histogram",
+        ]
+        for name, counts, total, count, _ in stages:
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f'molecule_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'molecule_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'molecule_stage_seconds_count{{stage="{name}"}} {count}')
+
+        lines += [
+            "# HELP molecule_stage_errors_total Failed runs of each pipeline stage.",
+            "# TYPE molecule_stage_errors_total counter",
+        ]
+        lines += [f'molecule_stage_errors_total{{stage="{name}"}} {errors}' for name, _, _, _, errors in stages]
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry used by every instrumented module
+metrics = StageMetrics()
+timed = metrics.timed
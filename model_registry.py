@@ -0,0 +1,109 @@
+import os
+import sys
+import threading
+import time
+
+
+def rss_bytes():
+    """Current resident memory of this process, None where it can't be read"""
+    try:
+        import psutil  # type: ignore
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Last resort, and only the peak so far: bytes on macOS, KB elsewhere
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _Entry:
+    def __init__(self, loader):
+        self.loader = loader
+        self.value = None
+        self.ready = False
+        self.loading = False
+        self.error = None
+        self.load_seconds = None
+        self.rss_delta = None
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Loads each registered model once, lazily or in a warm-up thread"""
+
+    def __init__(self):
+        self._entries = {}
+
+    def register(self, name, loader):
+        self._entries[name] = _Entry(loader)
+
+    def get(self, name):
+        entry = self._entries[name]
+        if entry.ready:
+            return entry.value
+
+        with entry.lock:
+            if entry.ready:
+                return entry.value
+            entry.loading = True
+            entry.error = None
+            print(f"⏳ Loading model: {name}")
+            start, rss_before = time.time(), rss_bytes()
+            try:
+                entry.value = entry.loader()
+            except Exception as e:
+                entry.error = str(e)
+                raise
+            finally:
+                entry.loading = False
+
+            entry.load_seconds = round(time.time() - start, 3)
+            rss_after = rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                entry.rss_delta = rss_after - rss_before
+            entry.ready = True
+            print(f"✅ Model loaded: {name} in {entry.load_seconds}s")
+            return entry.value
+
+    def ready(self, name=None):
+        names = [name] if name else list(self._entries)
+        return all(self._entries[n].ready for n in names)
+
+    def warm_up(self, names=None):
+        """Load models in a background thread, returns the thread"""
+        def load_all():
+            for name in names or list(self._entries):
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"❌ Model warm-up failed: {name}: {e}")
+
+        thread = threading.Thread(target=load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        rss = rss_bytes()
+        return {
+            "ready": self.ready(),
+            "rss_mb": round(rss / 2**20, 1) if rss else None,
+            "models": {
+                name: {
+                    "ready": entry.ready,
+                    "loading": entry.loading,
+                    "error": entry.error,
+                    "load_seconds": entry.load_seconds,
+                    "rss_delta_mb": round(entry.rss_delta / 2**20, 1) if entry.rss_delta is not None else None,
+                }
+                for name, entry in self._entries.items()
+            },
+        }
@@ -0,0 +1,116 @@
+import numpy as np
+
+# Per-element display data shared by every export stage
+ELEMENT_COLORS = {
+    'H': (1, 1, 1, 1),
+    'C': (0.2, 0.2, 0.2, 1),
+    'O': (1, 0, 0, 1),
+    'N': (0, 0, 1, 1),
+    'S': (1, 1, 0, 1),
+    'Cl': (0, 1, 0, 1),
+    'F': (0.5, 1, 0.5, 1)
+}
+DEFAULT_COLOR = (0.5, 0.5, 0.5, 1)
+
+
+# Atomic number -> symbol, "X" (0) for unknown and dummy atoms
+ELEMENT_SYMBOLS = tuple((
+    "X H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se Br Kr "
+    "Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb "
+    "Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr "
+    "Rf Db Sg Bh Hs Mt Ds Rg Cn Nh Fl Mc Lv Ts Og"
+).split())
+_ATOMIC_NUMBERS = {symbol.upper(): z for z, symbol in enumerate(ELEMENT_SYMBOLS)}
+
+
+def element_color(el):
+    return ELEMENT_COLORS.get(el, DEFAULT_COLOR)
+
+
+def atomic_numbers(symbols):
+    """uint8 atomic numbers for element symbols (any case) or numeric strings"""
+    symbols = np.asarray(symbols)
+    if symbols.dtype.kind == "S":
+        symbols = symbols.astype(str)
+    unique, inverse = np.unique(symbols, return_inverse=True)
+    codes = np.array([
+        int(s) if str(s).strip().isdigit() else _ATOMIC_NUMBERS.get(str(s).strip().upper(), 0)
+        for s in unique
+    ], dtype=np.uint8)
+    return codes[inverse].reshape(symbols.shape)
+
+
+def element_symbols(codes):
+    """Element symbols for an array of atomic numbers"""
+    return [ELEMENT_SYMBOLS[z] for z in np.asarray(codes).tolist()]
+
+
+class Molecule:
+    """One embedded conformer: atoms, coordinates and bonds"""
+
+    def __init__(self, name, elements, coords, bonds=None, smiles=None):
+        self.name = name
+        self.smiles = smiles
+        self.elements = list(elements)
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+
+        bonds = list(bonds or [])
+        self.bond_atoms = np.array([(i, j) for i, j, _ in bonds], dtype=np.int64).reshape(-1, 2)
+        self.bond_orders = np.array([order for _, _, order in bonds], dtype=np.float64)
+
+        if len(self.elements) != len(self.coords):
+            raise ValueError(f"{name}: {len(self.elements)} elements but {len(self.coords)} coordinates")
+
+    @classmethod
+    def from_rdkit(cls, mol, name, smiles=None, conf_id=-1):
+        """Snapshot one conformer of an embedded RDKit molecule"""
+        conf = mol.GetConformer(conf_id)
+        elements = [atom.GetSymbol() for atom in mol.GetAtoms()]
+        coords = conf.GetPositions()
+        bonds = [
+            (bond.GetBeginAtomIdx(), bond.GetEndAtomIdx(), bond.GetBondTypeAsDouble())
+            for bond in mol.GetBonds()
+        ]
+        return cls(name, elements, coords, bonds, smiles=smiles)
+
+    @property
+    def num_atoms(self):
+        return len(self.elements)
+
+    @property
+    def num_bonds(self):
+        return len(self.bond_orders)
+
+    @property
+    def atomic_numbers(self):
+        return atomic_numbers(self.elements)
+
+    @property
+    def bonds(self):
+        """Bonds as (start, end, order) tuples"""
+        return [
+            (int(i), int(j), float(order))
+            for (i, j), order in zip(self.bond_atoms, self.bond_orders)
+        ]
+
+    def without_hydrogens(self):
+        """Copy with hydrogens and their bonds removed (unchanged if all H)"""
+        keep = np.array([el != 'H' for el in self.elements], dtype=bool)
+        if keep.all() or not keep.any():
+            return self
+
+        new_index = np.cumsum(keep) - 1
+        bonds = [
+            (int(new_index[i]), int(new_index[j]), order)
+            for i, j, order in self.bonds
+            if keep[i] and keep[j]
+        ]
+        elements = [el for el, k in zip(self.elements, keep) if k]
+        return Molecule(self.name, elements, self.coords[keep], bonds, smiles=self.smiles)
+
+    def colors(self):
+        return [element_color(el) for el in self.elements]
+
+    def to_xyz(self):
+        from xyz_io import format_frame
+        return format_frame(self.elements, self.coords, comment=self.name)
@@ -0,0 +1,23 @@
+# Molecule SMILES dictionary
+molecule_db = {
+    "water":"H2O",
+    "methane": "C", "ethane": "CC", "propane": "CCC", "butane": "CCCC", "pentane": "CCCCC",
+    "hexane": "CCCCCC", "ethene": "C=C", "ethyne": "C#C", "benzene": "c1ccccc1", "methanol": "CO",
+    "ethanol": "CCO", "propanol": "CCCO", "butanol": "CCCCO", "isopropanol": "CC(O)C",
+    "glycerol": "C(C(CO)O)O", "formic acid": "C(=O)O", "acetic acid": "CC(=O)O", "propanoic acid": "CCC(=O)O",
+    "butanoic acid": "CCCC(=O)O", "benzoic acid": "c1ccc(cc1)C(=O)O", "methylamine": "CN",
+    "ethylamine": "CCN", "aniline": "c1ccccc1N", "formaldehyde": "C=O", "acetaldehyde": "CC=O",
+    "acetone": "CC(=O)C", "glucose": "OC[C@H]1O[C@@H](O)[C@H](O)[C@@H](O)[C@H]1O",
+    "fructose": "C(C1C(C(C(C(O1)(CO))O)O)O)=O", "sucrose": "OCC1OC(O)C(O)C(O)C1OC2(C(C(C(C(O2)CO)O)O)O)",
+    "glycine": "NCC(=O)O", "alanine": "CC(C(=O)O)N", "valine": "CC(C)C(C(=O)O)N", "leucine": "CC(C)CC(C(=O)O)N",
+    "phenylalanine": "C1=CC=C(C=C1)CC(C(=O)O)N", "tryptophan": "C1=CC=C2C(=C1)C(=CN2)CC(C(=O)O)N",
+    "ammonia": "N", "carbon dioxide": "O=C=O", "nitric acid": "O=N(=O)O", "sulfuric acid": "OS(=O)(=O)O",
+    "phosphoric acid": "OP(=O)(O)O", "hydrogen peroxide": "OO", "ozone": "O=O[O]",
+    "adenine": "C1=NC2=C(N1)N=CN2", "guanine": "C1=NC2=C(N1)C(=O)N=CN2", "cytosine": "C1=CN=CN1",
+    "uracil": "C1=CC(=O)NC(=O)N1", "thymine": "CC1=CN(C(=O)NC1=O)C", 
+    "cholesterol": "C[C@H](CCC(=O)O)C1CCC2C3CCC4=CC(=O)CCC4(C)C3CCC12C",
+    "caffeine": "CN1C=NC2=C1C(=O)N(C(=O)N2C)C", "nicotine": "CN1CCCC1C2=CN=CC=C2",
+    "oxygen": "O=O", "hydrogen": "[H][H]", "nitrogen": "N#N", "chlorine": "ClCl", "fluorine": "F[F]",
+    "aspirin": "CC(=O)Oc1ccccc1C(=O)O", "paracetamol": "CC(=O)NC1=CC=C(C=C1)O",
+    "acetylsalicylic acid": "CC(=O)Oc1ccccc1C(=O)O"
+}
@@ -0,0 +1,172 @@
+"""Precompiled molecule library with memory-mapped geometry.
+
+Build it offline once (and after editing molecule_db):
+    python molecule_library.py build [--out library]
+
+Every entry stores its canonical SMILES, name aliases, atoms, bonds and
+optimized 3D coordinates. Geometry for all entries lives in a few
+contiguous .npy arrays that each process memory-maps read-only, so
+lookups are dictionary hits and all workers share the same pages.
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from molecule import Molecule
+
+LIBRARY_DIR = os.environ.get("MOLECULE_LIBRARY_DIR", "library")
+ARRAYS = ("elements", "coords", "atom_offsets", "bonds", "bond_orders", "bond_offsets")
+
+
+def compile_library(entries, out_dir=LIBRARY_DIR):
+    """Embed every (name, smiles) entry and write the library files"""
+    from rdkit import Chem  # type: ignore
+    from generate_xyz import build_molecule
+
+    records = []
+    by_canonical = {}
+    for name, smiles in entries:
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            print(f"⚠️ Skipping {name}: invalid SMILES {smiles}")
+            continue
+        canonical = Chem.MolToSmiles(mol)
+
+        # Spellings of the same molecule share one geometry
+        if canonical in by_canonical:
+            record = by_canonical[canonical]
+            record["aliases"] = sorted(set(record["aliases"]) | {name})
+            record["spellings"] = sorted(set(record["spellings"]) | {smiles})
+            continue
+        try:
+            built = build_molecule(smiles, name)
+        except Exception as e:
+            print(f"⚠️ Skipping {name}: {e}")
+            continue
+
+        record = {"name": name, "smiles": smiles, "canonical": canonical,
+                  "aliases": [name], "spellings": sorted({smiles, canonical}), "molecule": built}
+        by_canonical[canonical] = record
+        records.append(record)
+
+    symbols = sorted({el for r in records for el in r["molecule"].elements})
+    codes = {el: i for i, el in enumerate(symbols)}
+    mols = [r["molecule"] for r in records]
+
+    arrays = {
+        "elements": np.array([codes[el] for m in mols for el in m.elements], dtype=np.uint8),
+        "coords": np.concatenate([m.coords for m in mols]).astype(np.float32),
+        "atom_offsets": np.cumsum([0] + [m.num_atoms for m in mols]).astype(np.int64),
+        "bonds": np.concatenate([m.bond_atoms for m in mols]).astype(np.int32),
+        "bond_orders": np.concatenate([m.bond_orders for m in mols]).astype(np.float32),
+        "bond_offsets": np.cumsum([0] + [m.num_bonds for m in mols]).astype(np.int64),
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    for key, array in arrays.items():
+        np.save(os.path.join(out_dir, f"{key}.npy"), np.ascontiguousarray(array))
+
+    index = {
+        "created": time.time(),
+        "symbols": symbols,
+        "entries": [{k: r[k] for k in ("name", "smiles", "canonical", "aliases", "spellings")} for r in records],
+    }
+    tmp_path = os.path.join(out_dir, "index.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp_path, os.path.join(out_dir, "index.json"))
+
+    print(f"✅ Library written: {out_dir} ({len(records)} molecules, {len(arrays['elements'])} atoms)")
+    return out_dir
+
+
+class MoleculeLibrary:
+    """Read-only view of a compiled library, geometry memory-mapped"""
+
+    def __init__(self, path=LIBRARY_DIR):
+        self.path = path
+        with open(os.path.join(path, "index.json"), "r") as f:
+            index = json.load(f)
+        self.symbols = index["symbols"]
+        self.entries = index["entries"]
+        self.arrays = {key: np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r") for key in ARRAYS}
+
+        # SMILES are case sensitive, names are matched lower-cased
+        self._lookup = {}
+        for i, entry in enumerate(self.entries):
+            for smiles in entry["spellings"]:
+                self._lookup[smiles] = i
+            for alias in entry["aliases"]:
+                self._lookup[alias.strip().lower()] = i
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return self.find(key) is not None
+
+    def find(self, key):
+        """Entry index for a name, alias or SMILES spelling, or None"""
+        index = self._lookup.get(key)
+        if index is None:
+            index = self._lookup.get(key.strip().lower())
+        return index
+
+    def find_smiles(self, smiles):
+        """Entry index for a SMILES spelling, canonicalizing unknown ones"""
+        index = self._lookup.get(smiles)
+        if index is None:
+            from glb_cache import canonical_smiles
+            index = self._lookup.get(canonical_smiles(smiles))
+        return index
+
+    def coords(self, index):
+        """Zero-copy (N, 3) float32 view of one entry's coordinates"""
+        start, end = self.arrays["atom_offsets"][index:index + 2]
+        return self.arrays["coords"][start:end]
+
+    def molecule(self, key, name=None):
+        index = key if isinstance(key, int) else self.find(key)
+        if index is None:
+            raise KeyError(key)
+
+        entry = self.entries[index]
+        a0, a1 = self.arrays["atom_offsets"][index:index + 2]
+        b0, b1 = self.arrays["bond_offsets"][index:index + 2]
+        elements = [self.symbols[code] for code in self.arrays["elements"][a0:a1]]
+        bonds = [
+            (int(i), int(j), float(order))
+            for (i, j), order in zip(self.arrays["bonds"][b0:b1], self.arrays["bond_orders"][b0:b1])
+        ]
+        return Molecule(name or entry["name"], elements, self.coords(index), bonds, smiles=entry["smiles"])
+
+
+_library = None
+
+
+def get_library(path=LIBRARY_DIR):
+    """Process-wide library, None when it hasn't been compiled"""
+    global _library
+    if _library is None and os.path.exists(os.path.join(path, "index.json")):
+        _library = MoleculeLibrary(path)
+        print(f"📚 Molecule library loaded: {len(_library)} molecules")
+    return _library
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the molecule library")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="embed molecule_db and write the library")
+    build.add_argument("--out", default=LIBRARY_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        from molecule_db import molecule_db
+        compile_library(molecule_db.items(), args.out)
+
+
+if __name__ == "__main__":
+    main()
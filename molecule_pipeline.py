@@ -0,0 +1,175 @@
+import os
+
+from generate_xyz import build_molecule, write_xyz
+from blender_script_gen import generate_blender_py, write_blender_payload, DRACO
+from export_glb_blender import run_blender_script, blender_available
+from gltf_writer import write_glb, low_detail_path, INSTANCING, QUANTIZE
+from blender_pool import get_blender_pool
+from glb_cache import GLBCache
+from molecule_library import get_library
+from bond_perception import load_structure
+from workspace import build_workspace, publish, clean_workspaces
+from artifact_server import ArtifactStore
+from metrics import timed
+
+OUTPUT_DIR = "outputs"
+
+# GLB backend: "blender", "native" (NumPy glTF writer, no Blender needed)
+# or "auto" (Blender when it is installed, native otherwise)
+GLB_BACKEND = os.environ.get("GLB_BACKEND", "auto")
+if GLB_BACKEND == "auto":
+    GLB_BACKEND = "blender" if blender_available() else "native"
+print(f"🧱 GLB backend: {GLB_BACKEND}")
+
+# Settings that change the produced GLB (part of the cache key)
+GENERATOR_SETTINGS = {"backend": GLB_BACKEND, "instancing": INSTANCING}
+if GLB_BACKEND == "native":
+    GENERATOR_SETTINGS.update(quantize=QUANTIZE)
+else:
+    GENERATOR_SETTINGS.update(draco=DRACO)
+# The low-detail preview is always written by the native writer
+LOW_DETAIL_SETTINGS = {"backend": "native", "detail": "low", "instancing": INSTANCING, "quantize": QUANTIZE}
+glb_cache = GLBCache()
+
+# Hashes and gzip/brotli copies of everything served from OUTPUT_DIR
+artifacts = ArtifactStore(OUTPUT_DIR)
+
+# Reuse long-lived Blender workers instead of one process per build
+USE_BLENDER_POOL = os.environ.get("USE_BLENDER_POOL", "1") == "1"
+
+# Write molecules/{name}.xyz alongside each build (debugging / downloads only)
+EXPORT_XYZ = os.environ.get("EXPORT_XYZ", "0") == "1"
+
+# Map the compiled molecule library (if built) once per process
+get_library()
+clean_workspaces()
+
+
+def _no_progress(stage):
+    pass
+
+
+def glb_path_for(name):
+    return f"{OUTPUT_DIR}/{name}.glb"
+
+
+def export_glb(mol, name, glb_path, work_dir, progress=_no_progress):
+    """Write the full-detail GLB to glb_path, scratch files go to work_dir"""
+    if GLB_BACKEND == "native":
+        progress("export")
+        with timed("write_glb", molecule=name):
+            write_glb(mol, glb_path)
+        return
+
+    progress("script")
+    if USE_BLENDER_POOL:
+        with timed("generate_blender_py", molecule=name):
+            payload_path = write_blender_payload(mol, os.path.join(work_dir, f"{name}_payload.json"))
+        progress("blender")
+        with timed("run_blender_script", molecule=name, pooled=True):
+            get_blender_pool().build_payload(os.path.abspath(payload_path), os.path.abspath(glb_path))
+    else:
+        with timed("generate_blender_py", molecule=name):
+            blender_script = generate_blender_py(mol, name, glb_path, work_dir=work_dir)
+        progress("blender")
+        with timed("run_blender_script", molecule=name, pooled=False):
+            run_blender_script(blender_script)
+    progress("export")
+
+
+def get_molecule(name, smiles, progress=_no_progress):
+    """Stored geometry from the compiled library, embedding only on a miss"""
+    library = get_library()
+    index = library.find_smiles(smiles) if library is not None else None
+    if index is not None:
+        progress("library")
+        with timed("library", molecule=name):
+            return library.molecule(index, name=name)
+    with timed("generate_xyz", molecule=name):
+        return build_molecule(smiles, name, progress=progress)
+
+
+def build_glb(name, smiles, glb_path, progress=_no_progress):
+    """Build one GLB without touching the cache"""
+    mol = get_molecule(name, smiles, progress=progress)
+    return export_glb_variants(mol, name, glb_path, progress=progress)
+
+
+def export_glb_variants(mol, name, glb_path, progress=_no_progress):
+    """Full GLB through the configured backend plus the low-detail preview.
+
+    Everything is written in a private workspace; finished files are
+    renamed into place, preview first, so a reader that finds the full GLB
+    also finds a complete preview.
+    """
+    with build_workspace(name) as work_dir:
+        full_path = os.path.join(work_dir, f"{name}.glb")
+        low_path = low_detail_path(full_path)
+        export_glb(mol, name, full_path, work_dir, progress=progress)
+
+        if not os.path.exists(full_path):
+            raise RuntimeError("Failed to generate 3D model.")
+        with timed("write_glb", molecule=name, detail="low"):
+            write_glb(mol, low_path, detail="low")
+        if EXPORT_XYZ:
+            publish(write_xyz(mol, os.path.join(work_dir, f"{name}.xyz")), f"molecules/{name}.xyz")
+
+        publish(low_path, low_detail_path(glb_path))
+        publish(full_path, glb_path)
+
+    print(f"✅ File created: {glb_path}")
+    return glb_path
+
+
+def build_molecule_glb(name, smiles, progress=_no_progress):
+    """Run every stage for one molecule, returns the GLB path"""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    glb_path = glb_path_for(name)
+
+    with timed("glb_cache_fetch", molecule=name):
+        hit = fetch_cached_glb(smiles, glb_path)
+    if hit:
+        print(f"⚡ Cache hit: {name}")
+        progress("cached")
+    else:
+        build_glb(name, smiles, glb_path, progress=progress)
+        cache_glb(smiles, glb_path)
+
+    artifacts.precompress(os.path.basename(glb_path))
+    artifacts.precompress(os.path.basename(low_detail_path(glb_path)))
+    return glb_path
+
+
+def build_structure_glb(name, path, label=None, progress=_no_progress):
+    """GLB for a coordinate-only XYZ/PDB file, bonds perceived from distances.
+
+    name is the output name (an upload id), label the molecule's display name.
+    """
+    glb_path = glb_path_for(name)
+    progress("bonds")
+    with timed("perceive_bonds", molecule=name):
+        mol = load_structure(path, label or name)
+    print(f"🔗 {name}: {mol.num_atoms} atoms, {mol.num_bonds} bonds perceived")
+
+    export_glb_variants(mol, name, glb_path, progress=progress)
+    artifacts.precompress(os.path.basename(glb_path))
+    artifacts.precompress(os.path.basename(low_detail_path(glb_path)))
+    return glb_path
+
+
+def fetch_cached_glb(smiles, glb_path):
+    """Copy both detail levels out of the cache, False unless both are there"""
+    # Preview first, like a fresh build publishes them
+    return (glb_cache.fetch(smiles, LOW_DETAIL_SETTINGS, low_detail_path(glb_path))
+            and glb_cache.fetch(smiles, GENERATOR_SETTINGS, glb_path))
+
+
+def glb_cached(smiles):
+    """Read-only check that both detail levels are cached"""
+    return (glb_cache.contains(smiles, GENERATOR_SETTINGS)
+            and glb_cache.contains(smiles, LOW_DETAIL_SETTINGS))
+
+
+def cache_glb(smiles, glb_path):
+    glb_cache.put(smiles, GENERATOR_SETTINGS, glb_path)
+    glb_cache.put(smiles, LOW_DETAIL_SETTINGS, low_detail_path(glb_path))
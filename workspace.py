@@ -0,0 +1,89 @@
+"""Private scratch directories for builds and atomic publishing of results.
+
+Every build writes its payload, scripts and GLBs inside its own temporary
+workspace and only moves finished files into place with os.replace, so
+readers of outputs/ never see a partial file and any number of builds,
+of the same molecule or different ones, can run side by side.
+"""
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Kept next to outputs/ so publishing is a same-filesystem rename
+WORKSPACE_DIR = os.environ.get("BUILD_WORKSPACE_DIR", "work")
+# Leave workspaces on disk for debugging
+KEEP_WORKSPACES = os.environ.get("KEEP_WORKSPACES", "0") == "1"
+# Workspaces left behind by a crashed process are removed after this long
+WORKSPACE_TTL = float(os.environ.get("BUILD_WORKSPACE_TTL", 24 * 3600))
+
+
+@contextmanager
+def build_workspace(name, root=WORKSPACE_DIR):
+    """Fresh directory for one build, removed afterwards"""
+    os.makedirs(root, exist_ok=True)
+    prefix = re.sub(r"[^A-Za-z0-9_.-]", "_", name)[:40] + "-"
+    path = tempfile.mkdtemp(prefix=prefix, dir=root)
+    try:
+        yield path
+    finally:
+        if not KEEP_WORKSPACES:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def publish(src, dest):
+    """Move a finished file to dest atomically, replacing any older version"""
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    try:
+        os.replace(src, dest)
+    except OSError:
+        # Different filesystem: stage a copy next to dest, then rename
+        publish_copy(src, dest)
+        os.remove(src)
+    return dest
+
+
+@contextmanager
+def atomic_path(dest):
+    """Temporary path next to dest that replaces dest once the block succeeds"""
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    tmp_path = f"{dest}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, dest)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def publish_copy(src, dest):
+    """Copy src to dest atomically, leaving src in place"""
+    with atomic_path(dest) as tmp_path:
+        shutil.copyfile(src, tmp_path)
+    return dest
+
+
+def write_atomic(path, data):
+    """Write bytes to path atomically"""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+    return path
+
+
+def clean_workspaces(root=WORKSPACE_DIR, max_age=WORKSPACE_TTL):
+    """Remove workspaces older than max_age seconds"""
+    if not os.path.isdir(root):
+        return 0
+    removed = 0
+    cutoff = time.time() - max_age
+    for entry in os.scandir(root):
+        if entry.is_dir() and entry.stat().st_mtime < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    if removed:
+        print(f"🧹 Removed {removed} stale build workspaces")
+    return removed
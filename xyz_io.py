@@ -0,0 +1,291 @@
+"""Bulk XYZ / extended-XYZ reading and writing with NumPy.
+
+Frames hold atomic numbers (uint8) and an (N, 3) float64 coordinate
+array; each frame is parsed or formatted in one vectorized pass instead
+of per-line Python work.
+
+    iter_frames(path)        stream frames from files of any size (.gz too)
+    XYZTrajectory(path)[n]   memory-mapped random access to frame n
+    write_frames(path, ...)  write one or many frames
+"""
+import gzip
+import mmap
+import os
+import shlex
+from itertools import islice
+from typing import NamedTuple
+
+import numpy as np
+
+from molecule import atomic_numbers, element_symbols
+
+DEFAULT_PROPERTIES = [("species", "S", 1), ("pos", "R", 3)]
+INDEX_CHUNK = 64 * 1024 * 1024
+
+
+class XYZFrame(NamedTuple):
+    numbers: np.ndarray
+    coords: np.ndarray
+    comment: str = ""
+    info: dict = None  # extended-XYZ key=value pairs of the comment line
+    arrays: dict = None  # extra per-atom columns (forces, charges, ...)
+
+    @property
+    def symbols(self):
+        return element_symbols(self.numbers)
+
+    def __len__(self):
+        return len(self.numbers)
+
+
+def _parse_value(text):
+    tokens = text.split()
+    try:
+        values = [int(t) for t in tokens]
+    except ValueError:
+        try:
+            values = [float(t) for t in tokens]
+        except ValueError:
+            return {"T": True, "F": False}.get(text, text)
+    return values[0] if len(values) == 1 else np.array(values)
+
+
+def parse_comment(comment):
+    """key=value pairs of an extended-XYZ comment line, {} for plain comments"""
+    if "=" not in comment:
+        return {}
+    try:
+        tokens = shlex.split(comment)
+    except ValueError:
+        return {}
+    info = {}
+    for token in tokens:
+        key, sep, value = token.partition("=")
+        info[key] = _parse_value(value) if sep else True
+    return info
+
+
+def parse_properties(spec):
+    """'species:S:1:pos:R:3' -> [("species", "S", 1), ("pos", "R", 3)]"""
+    fields = spec.split(":")
+    return [(fields[i], fields[i + 1], int(fields[i + 2])) for i in range(0, len(fields) - 2, 3)]
+
+
+def _parse_frame(count, comment, block):
+    comment = comment.decode("utf-8", "replace").strip()
+    info = parse_comment(comment)
+    properties = parse_properties(info.pop("Properties")) if isinstance(info.get("Properties"), str) \
+        else DEFAULT_PROPERTIES
+
+    tokens = block.split()
+    if count == 0:
+        return XYZFrame(np.zeros(0, np.uint8), np.zeros((0, 3)), comment, info, {})
+    if len(tokens) % count:
+        raise ValueError(f"XYZ frame: {len(tokens)} values do not split into {count} atoms")
+    table = np.array(tokens).reshape(count, -1)
+
+    numbers, coords, arrays = None, None, {}
+    column = 0
+    for name, kind, width in properties:
+        values = table[:, column:column + width]
+        column += width
+        if values.shape[1] != width:
+            raise ValueError(f"XYZ frame: missing column {name}")
+        if kind == "R":
+            values = values.astype(np.float64)
+        elif kind == "I":
+            values = values.astype(np.int64)
+        elif kind == "L":
+            values = np.isin(values, (b"T", b"True", b"1"))
+        else:
+            values = values.astype(str)
+        values = values[:, 0] if width == 1 else values
+
+        if name in ("species", "Z") and numbers is None:
+            numbers = atomic_numbers(values)
+        elif name == "pos" and coords is None:
+            coords = values
+        else:
+            arrays[name] = values
+
+    if numbers is None or coords is None:
+        raise ValueError("XYZ frame: needs species and pos columns")
+    return XYZFrame(numbers, coords, comment, info, arrays)
+
+
+def _open_binary(source):
+    if hasattr(source, "read"):
+        return source
+    if str(source).endswith(".gz"):
+        return gzip.open(source, "rb")
+    return open(source, "rb")
+
+
+def iter_frames(source):
+    """Yield frames one at a time; only the current frame is held in memory"""
+    f = _open_binary(source)
+    try:
+        while True:
+            header = f.readline()
+            if not header:
+                return
+            if not header.strip():
+                continue
+            count = int(header.split()[0])
+            comment = f.readline()
+            lines = list(islice(f, count))
+            if len(lines) < count:
+                raise ValueError(f"XYZ frame truncated: expected {count} atoms, got {len(lines)}")
+            yield _parse_frame(count, comment, b"".join(lines))
+    finally:
+        if f is not source:
+            f.close()
+
+
+def read_frames(source):
+    return list(iter_frames(source))
+
+
+class XYZTrajectory:
+    """Memory-mapped multi-frame XYZ file with random access by frame index.
+
+    Only each frame's header offset and atom count are kept; a frame's atom
+    block runs up to the next header and is located when the frame is read.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else b""
+        self._offsets, self._counts = self._index()
+
+    def _line_starts(self):
+        # Newline positions in chunks, so the scan never copies the whole file
+        yield np.zeros(1, dtype=np.int64) if self._size else np.zeros(0, dtype=np.int64)
+        for offset in range(0, self._size, INDEX_CHUNK):
+            chunk = np.frombuffer(self._mm[offset:offset + INDEX_CHUNK], dtype=np.uint8)
+            starts = np.flatnonzero(chunk == 10).astype(np.int64) + offset + 1
+            # A trailing newline opens no further line
+            yield starts[starts < self._size]
+
+    def _line_end(self, start):
+        end = self._mm.find(b"\n", start)
+        return self._size if end < 0 else end
+
+    def _index(self):
+        """(header offset, atom count) of every frame"""
+        offsets, counts = [], []
+        skip = 0  # lines of the current frame that lie in later chunks
+        for starts in self._line_starts():
+            line = skip
+            while line < len(starts):
+                start = starts[line]
+                header = self._mm[start:self._line_end(start)].strip()
+                if not header:
+                    line += 1
+                    continue
+                offsets.append(int(start))
+                counts.append(int(header.split()[0]))
+                line += counts[-1] + 2
+            skip = line - len(starts)
+        if skip > 0:
+            raise ValueError(f"{self.path}: frame {len(offsets) - 1} truncated")
+        return np.array(offsets, dtype=np.int64), np.array(counts, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = range(len(self))[index]
+        comment_start = self._line_end(int(self._offsets[index])) + 1
+        block_start = min(self._line_end(comment_start) + 1, self._size)
+        # Only blank lines can sit between a frame's atoms and the next header
+        end = int(self._offsets[index + 1]) if index + 1 < len(self) else self._size
+        return _parse_frame(int(self._counts[index]), self._mm[comment_start:block_start], self._mm[block_start:end])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _format_info(info, properties):
+    parts = [f"Properties={':'.join(f'{n}:{k}:{w}' for n, k, w in properties)}"]
+    for key, value in (info or {}).items():
+        if isinstance(value, bool):
+            value = "T" if value else "F"
+        elif isinstance(value, (list, tuple, np.ndarray)):
+            value = " ".join(str(v) for v in np.ravel(value))
+        value = str(value)
+        if not value or any(c in value for c in " \t\"'\\="):
+            value = '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+        parts.append(f"{key}={value}")
+    return " ".join(parts)
+
+
+def format_frame(elements, coords, comment="", info=None, arrays=None, precision=6):
+    """One frame as XYZ text; extended XYZ when info or arrays are given.
+
+    elements may be symbols or atomic numbers.
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    elements = np.asarray(elements)
+    symbols = element_symbols(elements) if elements.dtype.kind in "iu" else elements.astype(str)
+    count = len(coords)
+
+    columns = [np.asarray(symbols, dtype=object).reshape(count, 1), coords]
+    row = ["%s", *[f"%.{precision}f"] * 3]
+    properties = list(DEFAULT_PROPERTIES)
+    for name, values in (arrays or {}).items():
+        values = np.asarray(values).reshape(count, -1)
+        if values.dtype.kind == "b":
+            kind, fmt, values = "L", "%s", np.where(values, "T", "F")
+        elif values.dtype.kind in "iu":
+            kind, fmt = "I", "%d"
+        elif values.dtype.kind == "f":
+            kind, fmt = "R", f"%.{precision}f"
+        else:
+            kind, fmt = "S", "%s"
+        properties.append((name, kind, values.shape[1]))
+        row += [fmt] * values.shape[1]
+        columns.append(values)
+
+    if info or arrays:
+        # A comment read from an extended-XYZ file is the key=value line itself,
+        # already unpacked into info; only plain comments become a key
+        plain = {"comment": comment} if comment and not parse_comment(comment) else {}
+        comment = _format_info(dict(info or {}, **plain), properties)
+
+    table = np.empty((count, len(row)), dtype=object)
+    column = 0
+    for values in columns:
+        table[:, column:column + values.shape[1]] = values
+        column += values.shape[1]
+    body = ((" ".join(row) + "\n") * count) % tuple(table.ravel().tolist())
+    return f"{count}\n{comment.splitlines()[0] if comment else ''}\n{body}"
+
+
+def write_frames(path, frames, append=False, precision=6):
+    """Write XYZFrames (or (elements, coords[, comment]) tuples) to one file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "at" if append else "wt") as f:
+        for frame in frames:
+            if isinstance(frame, XYZFrame):
+                f.write(format_frame(frame.numbers, frame.coords, frame.comment, frame.info, frame.arrays, precision))
+            else:
+                f.write(format_frame(*frame, precision=precision))
+    return path